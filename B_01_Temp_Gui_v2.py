@@ -1,8 +1,26 @@
+import os
+import threading
+import time
 from tkinter import *
 from functools import partial  # to prevent unwanted windows
-from datetime import date
 import all_constants as c
 import conversion_rounding as cr
+import conversion_log as cl
+import conversion_cache as cc
+import conversion_table as ct
+import conversion_units as cu
+import history_store as hs
+import history_export as he
+import history_journal as hj
+import history_sqlite as hsql
+import history_view as hv
+
+# how often the history box checks on a running export (milliseconds)
+EXPORT_CHECK_MS = 100
+
+# how often waiting calculations are saved to the journal while the converter
+# is idle (milliseconds) - the journal only checks the time when one is added
+HISTORY_SYNC_MS = int(hj.SYNC_SECONDS * 1000)
 
 
 class Converter:
@@ -15,7 +33,35 @@ class Converter:
         Temperature converter GUI
         """
 
-        self.all_calculations_list = []
+        # calculation history (value | direction | answer | time) - saved to the
+        # journal file (or database), and the most recent calculations are reloaded from it
+        try:
+            if c.HISTORY_DATABASE is not None:
+                journal = hsql.SqliteHistory(c.HISTORY_DATABASE)
+            else:
+                journal = hj.HistoryJournal(c.HISTORY_JOURNAL)
+
+        # e.g. a read only folder or a damaged journal - the converter still
+        # works, but this session's history is only kept in memory (and the
+        # history box says so)
+        except (OSError, ValueError) as error:
+            cl.log_event("history not saved", cl.WARNING,
+                         file=c.HISTORY_DATABASE or c.HISTORY_JOURNAL, error=str(error))
+            journal = None
+            self.history_error = str(error)
+        else:
+            self.history_error = None
+
+        self.all_calculations = hs.HistoryStore(c.HISTORY_CAP, journal=journal,
+                                                reload=c.MAX_CALCS)
+
+        # answers for repeated conversions (see self.conversion_cache.stats())
+        self.conversion_cache = cc.ConversionCache()
+
+        # the open history / export box (None when it is closed) and the export thread
+        # (None until the first export)
+        self.history_export = None
+        self.export_thread = None
 
         self.temp_frame = Frame(padx=10, pady=10)
         self.temp_frame.grid()
@@ -73,8 +119,71 @@ class Converter:
         self.to_help_button = self.button_ref_list[2]
 
         # retrieve "history / export" button and disable it at the start
+        # (unless there are calculations from an earlier session)
         self.to_history_button = self.button_ref_list[3]
-        self.to_history_button.config(state=DISABLED)
+        if self.all_calculations.total == 0:
+            self.to_history_button.config(state=DISABLED)
+
+        # precision, rounding mode and arithmetic menus
+        self.rounding_frame = Frame(self.temp_frame)
+        self.rounding_frame.grid(row=5)
+
+        # precision choices (menu text | decimal places)
+        self.precision_choices = {
+            "Nearest 1°": 0,
+            "Nearest 0.1°": 1,
+            "Nearest 0.01°": 2,
+        }
+
+        # rounding choices (menu text | rounding mode)
+        self.rounding_choices = {
+            "Round half up": cr.HALF_UP,
+            "Banker's rounding": cr.HALF_EVEN,
+        }
+
+        # arithmetic choices (menu text | exact mode) - exact mode always rounds
+        # correctly, even for answers that are exactly half way (see cu.TIE_MARGIN)
+        self.arithmetic_choices = {
+            "Fast": False,
+            "Exact": True,
+        }
+
+        self.precision = StringVar(value="Nearest 1°")
+        self.rounding = StringVar(value="Round half up")
+        self.arithmetic = StringVar(value="Fast")
+
+        # menu list (variable | choices | column)
+        menu_details_list = [
+            [self.precision, self.precision_choices, 0],
+            [self.rounding, self.rounding_choices, 1],
+            [self.arithmetic, self.arithmetic_choices, 2],
+        ]
+
+        for item in menu_details_list:
+            make_menu = OptionMenu(self.rounding_frame, item[0], *item[1])
+            make_menu.config(font=("Arial", "11"), width=14)
+            make_menu.grid(row=0, column=item[2], padx=5, pady=5)
+
+            # cached answers were rounded the old way (the cache's counters are kept)
+            item[0].trace_add("write", lambda *args: self.conversion_cache.invalidate())
+
+        # unit conversion plans for answers that aren't rounded to the nearest
+        # degree (half up) with fast arithmetic, which come from the lookup table
+        self.unit_plans = {
+            c.TO_CELSIUS: cu.plan("fahrenheit", "celsius"),
+            c.TO_FAHRENHEIT: cu.plan("celsius", "fahrenheit"),
+        }
+
+        if journal is not None:
+            self.temp_frame.after(HISTORY_SYNC_MS, self.sync_history)
+
+    def sync_history(self):
+        """
+        Saves waiting calculations to the journal, and checks again shortly (so
+        the last few calculations don't sit in a buffer while the converter is idle)
+        """
+        self.all_calculations.sync()
+        self.temp_frame.after(HISTORY_SYNC_MS, self.sync_history)
 
     def check_temp(self, min_temp):
 
@@ -90,22 +199,14 @@ class Converter:
         self.answer_error.config(fg="#004C99", font=("Arial", "13", "bold"))
         self.temp_entry.config(bg="#FFFFFF")
 
-        error = f"Enter a number more than / equal to {min_temp}"
-        has_error = "no"
+        # checks the temperature is a number and not below absolute zero
+        to_convert, error = cr.validate_temp(to_convert, min_temp)
 
-        try:
-            to_convert = float(to_convert)
-            if to_convert >= min_temp:
-                self.convert(min_temp, to_convert)
-            else:
-                has_error = "yes"
-
-        except ValueError:
-            has_error = "yes"
-            error = "Please enter a number"
+        if error == "":
+            self.convert(min_temp, to_convert)
 
-        # checks the if the error message is necessary
-        if has_error != "no":
+        # shows the error message if necessary
+        else:
             self.answer_error.config(text=error, fg="#9C0000", font=("Arial", "10", "bold"))
             self.temp_entry.config(bg="#F4CCCC")
             self.temp_entry.delete(0, END)
@@ -118,19 +219,42 @@ class Converter:
         """
 
         if min_temp == c.ABS_ZERO_CELSIUS:
-            answer = cr.to_fahrenheit(to_convert)
-            answer_statement = f"{to_convert}°C is {answer}°F"
+            direction = c.TO_FAHRENHEIT
+        else:
+            direction = c.TO_CELSIUS
 
+        # repeated conversions come from the cache (answer and statement)
+        cached = self.conversion_cache.get(to_convert, direction)
+        if cached is not None:
+            answer, answer_statement = cached
+
+        # whole degrees are looked up, anything else is calculated - numeric
+        # answers are only formatted once, when the statement is built
         else:
-            answer = cr.to_celsius(to_convert)
-            answer_statement = f"{to_convert}°F is {answer}°C"
+            places = self.precision_choices[self.precision.get()]
+            mode = self.rounding_choices[self.rounding.get()]
+            exact = self.arithmetic_choices[self.arithmetic.get()]
+
+            if exact:
+                answer = self.unit_plans[direction].exact_rounder(places, mode)(to_convert)
+            elif places == 0 and mode == cr.HALF_UP:
+                answer = ct.default_table.convert(to_convert, direction)
+            else:
+                answer = self.unit_plans[direction].rounder(places, mode)(to_convert)
+
+            answer_statement = hs.make_statement(to_convert, direction, answer, places)
+            self.conversion_cache.put(to_convert, direction, answer, answer_statement)
 
         # enables the history export button as soon as we have a valid calculation
         self.to_history_button.config(state=NORMAL)
 
         self.answer_error.config(text=answer_statement)
-        self.all_calculations_list.append(answer_statement)
-        print(self.all_calculations_list)
+        self.all_calculations.append(to_convert, direction, answer)
+
+        # only builds the log message when debug logging is switched on
+        if cl.enabled(cl.DEBUG):
+            cl.log_event("convert", value=to_convert, direction=direction, answer=answer,
+                         history=self.all_calculations.total)
 
     def to_help(self):
         """
@@ -144,7 +268,77 @@ class Converter:
         Opens history dialogue box and disables history button
         (so that users can't create multiple history boxes)
         """
-        HistoryExport(self, self.all_calculations_list)
+        self.history_export = HistoryExport(self, self.all_calculations)
+
+    def start_export(self, all_calculations, export_format):
+        """
+        Starts exporting every calculation in the chosen format (to a new file
+        named after today). The file is written on a separate thread so the
+        converter keeps working during big exports. The export belongs to the
+        converter, not the history box, so it carries on (and is still checked
+        and logged) if the box is closed, and a reopened box can't start a
+        second export that picks the same file name.
+        """
+
+        self.export_file = he.export_file_name(export_format)
+        self.export_total = all_calculations.total
+
+        # progress / outcome of the export (set by the export thread)
+        self.export_written = 0
+        self.export_error = None
+
+        # the records are copied now, so new calculations don't change the export
+        records = all_calculations.iter_records()
+        self.export_thread = threading.Thread(target=self.run_export,
+                                              args=(records, export_format))
+        self.export_thread.start()
+
+        self.check_export()
+
+    def run_export(self, records, export_format):
+        """
+        Writes the export file (runs on the export thread - no widget changes here)
+        """
+
+        try:
+            he.export_history(records, self.export_file, export_format,
+                              progress=self.update_export_progress)
+        except Exception as error:
+            self.export_error = error
+
+    def update_export_progress(self, written):
+        """
+        Records how many calculations have been written (called by the export thread)
+        """
+        self.export_written = written
+
+    def export_running(self):
+        """
+        :return: True while an export is being written
+        """
+        return self.export_thread is not None and self.export_thread.is_alive()
+
+    def check_export(self):
+        """
+        Shows the export progress in the history box (if it is open) and checks
+        again shortly until the export is done
+        """
+
+        if self.export_running():
+            if self.history_export is not None:
+                self.history_export.show_export_progress(self.export_written, self.export_total)
+            self.temp_frame.after(EXPORT_CHECK_MS, self.check_export)
+            return
+
+        if self.export_error is not None:
+            cl.log_event("export failed", cl.WARNING, file=self.export_file,
+                         error=str(self.export_error))
+        else:
+            cl.log_event("export", cl.INFO, file=self.export_file,
+                         calculations=self.export_written)
+
+        if self.history_export is not None:
+            self.history_export.show_export_result(self.export_file, self.export_error)
 
 
 class DisplayHelp:
@@ -215,7 +409,7 @@ class HistoryExport:
     Displays history dialogue box
     """
 
-    def __init__(self, partner, all_calculations_list):
+    def __init__(self, partner, all_calculations):
         # setup dialogue box and background colour
 
         self.history_box = Toplevel()
@@ -230,77 +424,61 @@ class HistoryExport:
         self.help_frame = Frame(self.history_box)
         self.help_frame.grid()
 
-        # background colour and text for calculation area
-        if len(all_calculations_list) <= c.MAX_CALCS:
-            calc_back = "#D5E804"
-            calc_amount = "all your calculations"
-        else:
-            calc_back = "#ffe6cc"
-            calc_amount = (f"your calculations -"
-                           f"showing {c.MAX_CALCS} / {len(all_calculations_list)}")
-
-        # create string from calculations list (newest calculations first)
-        newest_first_string = ""
-        newest_first_list = list(reversed(all_calculations_list))
-
-        # last item added in outside the for loop so that the spacing is correct
-        if len(newest_first_list) <= c.MAX_CALCS:
-
-            for item in newest_first_list[:-1]:
-                newest_first_string += item + "\n"
-
-            newest_first_string += newest_first_list[-1]
-
-        # if we have more than five items
-        else:
-            # makes it so that the string will only contain
-            # the 5 most recent calculations - MAX_CALCS = 5, so it
-            # takes the 5 most recent inside the list because it's actually just [5]
-            for item in newest_first_list[:c.MAX_CALCS - 1]:
-                newest_first_string += item + "\n"
-
-            newest_first_string += newest_first_list[c.MAX_CALCS - 1]
-
-        # strings for 'long' labels...
-        recent_intro_txt = f"Below are {calc_amount} calculations " \
-                           f"(to the nearest degree)."
+        self.partner = partner
+        self.all_calculations = all_calculations
 
-        export_instruction_txt = ("Please push <Export> to save your calculations "
-                                  "in a text file. If the filename already exists "
-                                  "it will be overwritten")
+        export_instruction_txt = ("Please choose a file format and push <Export> to save "
+                                  "your calculations. If a file with today's name already "
+                                  "exists, a number is added to the new file's name")
 
-        # all_calculations_list = ""
-
-        # label list (label text | format | bg)
+        # label list (label text | format | row) - the intro label is filled in below
         history_labels_list = [
-            ["History / Export", ("Arial", "16", "bold"), None],
-            [recent_intro_txt, ("Arial", "11",), None],
-            [newest_first_string, ("Arial", "14"), calc_back],
-            [export_instruction_txt, ("Arial", "11"), None],
+            ["History / Export", ("Arial", "16", "bold"), 0],
+            ["", ("Arial", "11",), 1],
+            [export_instruction_txt, ("Arial", "11"), 3],
         ]
 
         history_label_ref = []
-        for count, item in enumerate(history_labels_list):
+        for item in history_labels_list:
             make_label = Label(self.history_box, text=item[0], font=item[1],
-                               bg=item[2],
                                wraplength=300, justify="left", pady=10, padx=20)
-            make_label.grid(row=count)
+            make_label.grid(row=item[2])
 
             history_label_ref.append(make_label)
 
+        # scrolling list of calculations (newest first) - only the rows on
+        # screen are drawn, so it doesn't slow down with long histories
+        self.calculations_view = hv.HistoryView(self.history_box, all_calculations)
+        self.calculations_view.grid(row=2, padx=20)
+
+        # retrieve intro label so it can be updated
+        # when new calculations are made while the box is open
+        self.recent_intro_label = history_label_ref[1]
+        self.show_recent()
+
         # retrieve export instruction la bel so that we can
         # configure it to show the filename if the user exports the file
-        self.export_filename_label = history_label_ref[3]
+        self.export_filename_label = history_label_ref[2]
+
+        # keep up to date with new calculations until the box is closed
+        all_calculations.add_listener(self.add_calculation)
 
-        # make frame to hold buttons (two columns)
+        # make frame to hold buttons (three columns - format menu, export, close)
         self.hist_button_frame = Frame(self.history_box)
         self.hist_button_frame.grid(row=4)
 
+        # export file format menu
+        self.export_format = StringVar(value="Text")
+        self.format_menu = OptionMenu(self.hist_button_frame, self.export_format,
+                                      *he.FORMATS)
+        self.format_menu.config(font=("Arial", "11"))
+        self.format_menu.grid(row=0, column=2, padx=10, pady=10)
+
         button_ref_list = []
 
         # button list (button text | bg colour | command | row | column)
         button_details_list = [
-            ["Export", "#004C99", lambda: self.export_data(all_calculations_list), 0, 0],
+            ["Export", "#004C99", lambda: self.export_data(all_calculations), 0, 0],
             ["Close", "#666666", partial(self.close_history, partner), 0, 1],
         ]
 
@@ -310,38 +488,94 @@ class HistoryExport:
                                       text=btn[0], bg=btn[1],
                                       command=btn[2])
             self.make_button.grid(row=btn[3], column=btn[4], padx=10, pady=10)
+            button_ref_list.append(self.make_button)
 
-    def export_data(self, all_calculations_list):
+        # retrieve export button so it can be disabled while an export is running
+        self.export_button = button_ref_list[0]
 
-        # get current date for the text file
-        today = date.today()
+        # an export started before the box was last closed may still be running
+        if partner.export_running():
+            self.show_export_progress(partner.export_written, partner.export_total)
 
-        # get day, month and year
-        day = today.strftime("%d")
-        month = today.strftime("%m")
-        year = today.strftime("%Y")
+        # the history can be searched if it is kept in a database
+        if isinstance(all_calculations.journal, hsql.SqliteHistory):
+            HistorySearch(self.history_box, all_calculations.journal)
 
-        # edit labels so users know that their export has been done
-        file_name = f"temperatures_{year}_{month}_{day}"
+    def show_recent(self):
+        """
+        Shows how many calculations there are (and the colour of the calculation list)
+        """
 
-        success_string = (f"Export Successful! The file is "
-                          f"called {file_name}.txt")
+        # background colour and text for calculation area
+        in_memory = len(self.all_calculations)
+        if self.all_calculations.total <= in_memory:
+            calc_back = "#D5E804"
+            calc_amount = "all your calculations"
+        else:
+            calc_back = "#ffe6cc"
+            calc_amount = (f"your recent calculations -"
+                           f"showing {in_memory} / {self.all_calculations.total}")
 
-        self.export_filename_label.config(fg="#009900", text=success_string,
+        recent_intro_txt = f"Below are {calc_amount}, newest first " \
+                           f"(rounded to the precision picked). Scroll to see older ones."
+
+        # the journal couldn't be opened when the converter started
+        if self.partner.history_error is not None:
+            recent_intro_txt += (f"\n\nYour history is not being saved, so it will be "
+                                 f"lost when the converter closes "
+                                 f"({self.partner.history_error})")
+
+        self.recent_intro_label.config(text=recent_intro_txt)
+        self.calculations_view.config(bg=calc_back)
+
+    def add_calculation(self, item):
+        """
+        Adds a new calculation to the top of the box (called by the history store)
+        """
+
+        self.calculations_view.calculation_added()
+        self.show_recent()
+
+    def export_data(self, all_calculations):
+        """
+        Starts exporting every calculation in the chosen format (see
+        Converter.start_export)
+        """
+
+        # only one export at a time
+        self.export_button.config(state=DISABLED)
+        self.partner.start_export(all_calculations, self.export_format.get())
+
+    def show_export_progress(self, written, total):
+        """
+        Shows how far the running export has got (called by the converter)
+        """
+
+        self.export_button.config(state=DISABLED)
+
+        progress_string = f"Exporting... {written:,} / {total:,} calculations"
+        self.export_filename_label.config(fg="#004C99", text=progress_string,
                                           font=("Arial", "12", "bold"))
 
-        write_to = f"{file_name}.txt"
+    def show_export_result(self, export_file, export_error):
+        """
+        Shows how the export went and lets users export again (called by the converter)
+        """
+
+        self.export_button.config(state=NORMAL)
+
+        if export_error is not None:
+            self.export_filename_label.config(fg="#9C0000",
+                                              text=f"Export failed: {export_error}",
+                                              font=("Arial", "12", "bold"))
+            return
+
+        # edit labels so users know that their export has been done
+        success_string = (f"Export Successful! The file is "
+                          f"called {os.path.basename(export_file)}")
 
-        with open(write_to, "w") as text_file:
-            text_file.write("***** Temperature Calculations ***** \n")
-            text_file.write(f"Generated: {day}/{month}/{year}\n\n")
-            text_file.write("Here is your calculation history (oldest to newest) \n")
-            print(all_calculations_list)
-            # write the item to file
-            for item in all_calculations_list:
-                print(item)
-                text_file.write(item)
-                text_file.write("\n")
+        self.export_filename_label.config(fg="#009900", text=success_string,
+                                          font=("Arial", "12", "bold"))
 
     def close_history(self, partner):
         """
@@ -349,13 +583,125 @@ class HistoryExport:
         """
         # put history button back to normal
         partner.to_history_button.config(state=NORMAL)
+        partner.history_export = None
+        self.all_calculations.remove_listener(self.add_calculation)
         self.history_box.destroy()
 
 
+class HistorySearch:
+    """
+    Search panel for the History / Export box (database history only).
+    Results are loaded a page at a time, newest first.
+    """
+
+    def __init__(self, parent, database):
+        self.database = database
+
+        self.search_frame = Frame(parent, padx=10, pady=10)
+        self.search_frame.grid(row=5)
+
+        Label(self.search_frame, text="Search History",
+              font=("Arial", "14", "bold")).grid(row=0, columnspan=4)
+
+        # direction choices (menu text | direction)
+        self.direction_choices = {
+            "All conversions": None,
+            "°F to °C": c.TO_CELSIUS,
+            "°C to °F": c.TO_FAHRENHEIT,
+        }
+        self.direction = StringVar(value="All conversions")
+        OptionMenu(self.search_frame, self.direction,
+                   *self.direction_choices).grid(row=1, column=0, columnspan=4, pady=5)
+
+        # filter entry boxes (label text | row | column) - From / To are in °F
+        # whichever way the temperature was converted
+        entry_details_list = [
+            ["From °F", 2, 0],
+            ["To °F", 2, 2],
+            ["Last ... days", 3, 0],
+        ]
+
+        entry_ref_list = []
+        for item in entry_details_list:
+            Label(self.search_frame, text=item[0],
+                  font=("Arial", "11")).grid(row=item[1], column=item[2], sticky="e")
+            make_entry = Entry(self.search_frame, width=8, font=("Arial", "11"))
+            make_entry.grid(row=item[1], column=item[2] + 1, padx=5, pady=5, sticky="w")
+            entry_ref_list.append(make_entry)
+
+        self.min_entry, self.max_entry, self.days_entry = entry_ref_list
+
+        self.search_button = Button(self.search_frame, text="Search", bg="#004C99",
+                                    fg="#FFFFFF", font=("Arial", "11", "bold"),
+                                    command=self.search)
+        self.search_button.grid(row=3, column=2, columnspan=2, pady=5)
+
+        # results list (only the pages loaded so far are in it)
+        self.results_list = Listbox(self.search_frame, width=36, height=8,
+                                    font=("Arial", "11"))
+        self.results_list.grid(row=4, column=0, columnspan=4)
+
+        self.more_button = Button(self.search_frame, text="More results",
+                                  font=("Arial", "11"), state=DISABLED,
+                                  command=self.load_page)
+        self.more_button.grid(row=5, column=0, columnspan=4, pady=5)
+
+        self.filters = {}
+        self.last_id = None
+
+    def search(self):
+        """
+        Starts a new search with the filters entered
+        """
+
+        try:
+            min_value = float(self.min_entry.get()) if self.min_entry.get() else None
+            max_value = float(self.max_entry.get()) if self.max_entry.get() else None
+            days = float(self.days_entry.get()) if self.days_entry.get() else None
+        except ValueError:
+            self.results_list.delete(0, END)
+            self.results_list.insert(END, "Please enter numbers in the search boxes")
+            return
+
+        self.filters = {
+            "direction": self.direction_choices[self.direction.get()],
+            "min_value": min_value,
+            "max_value": max_value,
+            "since": None if days is None else time.time() - days * 24 * 60 * 60,
+        }
+        self.last_id = None
+        self.results_list.delete(0, END)
+        self.load_page()
+
+    def load_page(self):
+        """
+        Adds the next page of results to the list
+        """
+
+        results = self.database.query(before_id=self.last_id, **self.filters)
+        for calc_id, item in results:
+            self.results_list.insert(END, hs.make_statement(item.value, item.direction,
+                                                            item.result))
+            self.last_id = calc_id
+
+        if not results and self.results_list.size() == 0:
+            self.results_list.insert(END, "No calculations found")
+
+        # a full page means there might be more
+        if len(results) == hsql.PAGE_SIZE:
+            self.more_button.config(state=NORMAL)
+        else:
+            self.more_button.config(state=DISABLED)
+
+
 # main routine
 
 if __name__ == "__main__":
+    cl.setup_logging()
     root = Tk()
     root.title("Temperature Converter")
-    Converter()
+    converter = Converter()
     root.mainloop()
+
+    # makes sure the last calculations are saved to the journal
+    converter.all_calculations.close()
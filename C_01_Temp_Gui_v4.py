@@ -1,5 +1,6 @@
 from tkinter import *
 import all_constants as c
+import conversion_log as cl
 import conversion_rounding as cr
 
 
@@ -85,22 +86,14 @@ class Converter:
         self.answer_error.config(fg="#004C99", font=("Arial", "13", "bold"))
         self.temp_entry.config(bg="#FFFFFF")
 
-        error = f"Enter a number more than / equal to {min_temp}"
-        has_error = "no"
+        # checks the temperature is a number and not below absolute zero
+        to_convert, error = cr.validate_temp(to_convert, min_temp)
 
-        try:
-            to_convert = float(to_convert)
-            if to_convert >= min_temp:
-                self.convert(min_temp, to_convert)
-            else:
-                has_error = "yes"
+        if error == "":
+            self.convert(min_temp, to_convert)
 
-        except ValueError:
-            has_error = "yes"
-            error = "Please enter a number"
-
-        # checks the if the error message is necessary
-        if has_error != "no":
+        # shows the error message if necessary
+        else:
             self.answer_error.config(text=error, fg="#9C0000", font=("Arial", "10", "bold"))
             self.temp_entry.config(bg="#F4CCCC")
             self.temp_entry.delete(0, END)
@@ -112,25 +105,33 @@ class Converter:
         Also stores calculations for Export / History feature.
         """
 
+        # numeric answers are only formatted once, when the statement is built
         if min_temp == c.ABS_ZERO_CELSIUS:
-            answer = cr.to_fahrenheit(to_convert)
-            answer_statement = f"{to_convert}°C is {answer}°F"
+            direction = c.TO_FAHRENHEIT
+            answer = cr.to_fahrenheit_num(to_convert)
+            answer_statement = f"{to_convert}°C is {answer:.0f}°F"
 
         else:
-            answer = cr.to_celsius(to_convert)
-            answer_statement = f"{to_convert}°F is {answer}°C"
+            direction = c.TO_CELSIUS
+            answer = cr.to_celsius_num(to_convert)
+            answer_statement = f"{to_convert}°F is {answer:.0f}°C"
 
         # enables the history export button as soon as we have a valid calculation
         self.to_history_button.config(state=NORMAL)
 
         self.answer_error.config(text=answer_statement)
         self.all_calculations_list.append(answer_statement)
-        print(self.all_calculations_list)
+
+        # only builds the log message when debug logging is switched on
+        if cl.enabled(cl.DEBUG):
+            cl.log_event("convert", value=to_convert, direction=direction, answer=answer,
+                         history=len(self.all_calculations_list))
 
 
 # main routine
 
 if __name__ == "__main__":
+    cl.setup_logging()
     root = Tk()
     root.title("Temperature Converter")
     Converter()
@@ -1,4 +1,39 @@
+from fractions import Fraction
+import math
+
 # constants used to convert temperatures
 
-ABS_ZERO_CELSIUS = -273
-ABS_ZERO_FAHRENHEIT = -459
+# temperature units (symbol | multiplier | offset) - a temperature in each unit
+# is kelvin * multiplier + offset. The numbers are exact fractions so the
+# conversion between any two units can be worked out without rounding errors.
+UNITS = {
+    "kelvin": ["K", Fraction(1), Fraction(0)],
+    "celsius": ["°C", Fraction(1), Fraction("-273.15")],
+    "fahrenheit": ["°F", Fraction(9, 5), Fraction("-459.67")],
+    "rankine": ["°R", Fraction(9, 5), Fraction(0)],
+    "reaumur": ["°Ré", Fraction(4, 5), Fraction("-218.52")],
+}
+
+# absolute zero in each unit (0 K), and the lowest whole degree that can be converted
+ABS_ZERO = {unit: float(details[2]) for unit, details in UNITS.items()}
+MIN_TEMP = {unit: math.ceil(details[2]) for unit, details in UNITS.items()}
+
+ABS_ZERO_CELSIUS = MIN_TEMP["celsius"]
+ABS_ZERO_FAHRENHEIT = MIN_TEMP["fahrenheit"]
+
+# conversion directions (stored in the calculation history)
+TO_CELSIUS = 0
+TO_FAHRENHEIT = 1
+
+# number of calculations shown in the History / Export box
+MAX_CALCS = 5
+
+# most calculations kept in memory (older ones are dropped or spilled to disk)
+HISTORY_CAP = 1000000
+
+# file every calculation is saved to (reloaded when the converter starts)
+HISTORY_JOURNAL = "temperature_history.journal"
+
+# optional SQLite database to keep the history in instead of the journal
+# (e.g. "temperature_history.db") - lets the History / Export box search it
+HISTORY_DATABASE = None
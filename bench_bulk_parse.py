@@ -0,0 +1,86 @@
+import argparse
+import random
+import timeit
+import all_constants as c
+import bulk_parse as bp
+import conversion_rounding as cr
+
+# Benchmark - bulk parser vs. checking values one at a time with validate_temp,
+# for clean input and for input with more and more bad values (bad values that
+# repeat, like blanks and "N/A", and bad values that are all different)
+# Run with: python bench_bulk_parse.py [--size 100000]
+
+REPEATS = 5
+
+# share of bad values (percent)
+DIRTY_LEVELS = [0, 1, 10, 25, 50, 75, 100]
+
+# bad values that repeat (the last one is a number, but below absolute zero)
+REPEATED_BAD = ["", "N/A", "abc", "12abc", "-500"]
+
+
+def make_values(size, dirty, unique, seed=1):
+    """
+    Made up typed temperatures
+    :param dirty: Percentage of values that are bad
+    :param unique: True for bad values that are all different
+    """
+
+    rng = random.Random(seed)
+    values = []
+    for count in range(size):
+        if rng.random() * 100 < dirty:
+            values.append(f"x{count}" if unique else rng.choice(REPEATED_BAD))
+        else:
+            values.append(str(rng.randint(-400, 1000) / 2))
+
+    return values
+
+
+def check_one_at_a_time(values, min_temp):
+    """
+    The checks as they were done before bulk_parse (one validate_temp call per value)
+    """
+
+    good_indexes = []
+    good_values = []
+    errors = []
+    for index, raw in enumerate(values):
+        to_convert, error = cr.validate_temp(raw, min_temp)
+        if error == "":
+            good_indexes.append(index)
+            good_values.append(to_convert)
+        else:
+            errors.append((index, error))
+
+    return good_indexes, good_values, errors
+
+
+def check_bulk(values, min_temp):
+    numbers, valid, errors = bp.parse_values(values, min_temp)
+    return bp.valid_numbers(numbers, valid), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk input parser benchmark")
+    parser.add_argument("--size", type=int, default=100000, help="values per batch")
+    args = parser.parse_args(argv)
+
+    print(f"{args.size} values")
+    print(f"{'bad values':<16}{'one at a time (ms)':>20}{'bulk (ms)':>12}{'speed-up':>10}")
+    for unique in (False, True):
+        for dirty in DIRTY_LEVELS:
+            values = make_values(args.size, dirty, unique)
+
+            times = []
+            for func in (check_one_at_a_time, check_bulk):
+                times.append(min(timeit.repeat(lambda: func(values, c.ABS_ZERO_CELSIUS),
+                                               number=1, repeat=REPEATS)))
+
+            label = f"{dirty}% {'unique' if unique else 'repeated'}"
+            print(f"{label:<16}{times[0] * 1000:>20.1f}{times[1] * 1000:>12.1f}"
+                  f"{times[0] / times[1]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
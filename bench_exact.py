@@ -0,0 +1,62 @@
+import argparse
+import sys
+import timeit
+import bench_rounding as br
+import conversion_rounding as cr
+import conversion_units as cu
+
+# Benchmark - exact mode against the float conversion, for each precision and
+# rounding mode, checked against the throughput budget (cu.EXACT_BUDGET)
+# Run with: python bench_exact.py [--size 100000] [--budget 2.0]
+# Exits with status 1 if exact mode is over its budget for any mode
+
+REPEATS = 5
+
+
+def time_func(func, values):
+    """
+    :return: Nanoseconds per value (best of REPEATS)
+    """
+
+    seconds = min(timeit.repeat(lambda: list(map(func, values)), number=1, repeat=REPEATS))
+    return seconds / len(values) * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exact mode benchmark")
+    parser.add_argument("--size", type=int, default=100000, help="values per batch")
+    parser.add_argument("--budget", type=float, default=cu.EXACT_BUDGET,
+                        help=f"most times slower than the float conversion exact mode "
+                             f"can be (default: {cu.EXACT_BUDGET})")
+    args = parser.parse_args(argv)
+
+    # typed values with up to 3 decimal places, converted from C to F
+    values = br.make_values(args.size)
+    conversion = cu.plan("celsius", "fahrenheit")
+
+    print(f"{args.size} values, ns per value, budget {args.budget:g}x")
+    print(f"{'mode':<12}{'places':>7}{'float':>10}{'exact':>10}{'slower':>9}"
+          f"{'fixed':>8}{'result':>8}")
+
+    passed = True
+    for mode in cr.ROUNDING_MODES:
+        for places in cr.PLACES:
+            float_func = conversion.rounder(places, mode)
+            exact_func = conversion.exact_rounder(places, mode)
+
+            # answers the float conversion gets wrong
+            fixed = sum(map(float.__ne__, map(float_func, values), map(exact_func, values)))
+
+            times = [time_func(float_func, values), time_func(exact_func, values)]
+            slower = times[1] / times[0]
+            result = "PASS" if slower <= args.budget else "FAIL"
+            passed = passed and result == "PASS"
+
+            print(f"{mode:<12}{places:>7}{times[0]:>10.0f}{times[1]:>10.0f}"
+                  f"{slower:>8.2f}x{fixed:>8}{result:>8}")
+
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
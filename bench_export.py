@@ -0,0 +1,55 @@
+import argparse
+import os
+import tempfile
+import time
+import bench_suite as bs
+import history_export as he
+import history_store as hs
+
+# Benchmark - history export at 10^6+ calculations, in each format, against
+# the original one-write-per-item text export
+# Run with: python bench_export.py [--size 1000000]
+
+
+def original_export(history, file_name):
+    """
+    The export as it was written before history_export (a write call per item and newline)
+    """
+
+    with open(file_name, "w") as text_file:
+        text_file.write("***** Temperature Calculations ***** \n")
+        text_file.write("Here is your calculation history (oldest to newest) \n")
+        for record in history.iter_records():
+            text_file.write(hs.make_statement(record.value, record.direction, record.result))
+            text_file.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="History export benchmark")
+    parser.add_argument("--size", type=int, default=1000000, help="calculations to export")
+    args = parser.parse_args(argv)
+
+    history = bs.make_history(args.size)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        print(f"{args.size} calculations")
+        print(f"{'export':<22}{'seconds':>10}{'calcs/s':>14}{'MB':>8}")
+
+        file_name = os.path.join(temp_dir, "original.txt")
+        start = time.perf_counter()
+        original_export(history, file_name)
+        seconds = time.perf_counter() - start
+        print(f"{'original text':<22}{seconds:>10.2f}{args.size / seconds:>14,.0f}"
+              f"{os.path.getsize(file_name) / 1e6:>8.1f}")
+
+        for export_format in he.FORMATS:
+            file_name = he.export_file_name(export_format, temp_dir)
+            start = time.perf_counter()
+            he.export_history(history.iter_records(), file_name, export_format)
+            seconds = time.perf_counter() - start
+            print(f"{export_format:<22}{seconds:>10.2f}{args.size / seconds:>14,.0f}"
+                  f"{os.path.getsize(file_name) / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import importlib
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import all_constants as c
+
+# Benchmark - GUI latency. Drives the Converter, DisplayHelp and HistoryExport
+# windows the way a user would (typing, pressing buttons, opening and closing
+# the help and history boxes) and times each interaction until the screen has
+# been updated. Starts a virtual display (Xvfb) if there is no display.
+# Run with: python bench_gui_latency.py [--interactions 5000] [--convert-budget 5]
+# Exits with status 1 if the 99th percentile of any interaction is over its budget,
+# and status 2 if it couldn't be run (no display and no Xvfb)
+
+# typed in temperatures (good, too cold and not a number)
+INPUTS = ["100", "37.5", "-40", "0", "-500", "abc", "", "1e3", "212", " 21 "]
+
+# a help box and a history box are opened (and closed) every this many conversions
+WINDOW_EVERY = 50
+
+# default budgets (99th percentile, milliseconds)
+CONVERT_BUDGET = 5.0
+WINDOW_BUDGET = 50.0
+
+
+def start_virtual_display():
+    """
+    Starts Xvfb on a free display number and points DISPLAY at it
+    :return: Xvfb process (None if Xvfb isn't installed)
+    """
+
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None
+
+    for number in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            continue
+
+        process = subprocess.Popen([xvfb, f":{number}", "-nolisten", "tcp",
+                                    "-screen", "0", "1280x1024x24"],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # wait for the display's socket to appear
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return process
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+
+        process.terminate()
+
+    return None
+
+
+def summary(times):
+    """
+    :param times: List of seconds
+    :return: (count, median, 95th percentile, 99th percentile, slowest) in milliseconds
+    """
+
+    ordered = sorted(times)
+    count = len(ordered)
+    return [count,
+            statistics.median(ordered) * 1000,
+            ordered[min(count - 1, int(count * 0.95))] * 1000,
+            ordered[min(count - 1, int(count * 0.99))] * 1000,
+            ordered[-1] * 1000]
+
+
+def run_interactions(gui, root, interactions):
+    """
+    Runs the scripted interactions
+    :param gui: GUI module (with Converter, DisplayHelp and HistoryExport classes)
+    :param root: Tk root window
+    :param interactions: Number of conversions to do
+    :return: Dictionary of {interaction: list of seconds}
+    """
+
+    times = {"create Converter": [], "convert": [], "open help": [], "close help": [],
+             "open history": [], "close history": []}
+
+    def timed(name, action):
+        start = time.perf_counter()
+        result = action()
+        root.update_idletasks()
+        times[name].append(time.perf_counter() - start)
+
+        # handle any other events (e.g. window manager) outside the timing
+        root.update()
+        return result
+
+    converter = timed("create Converter", gui.Converter)
+
+    # To Celsius / To Fahrenheit buttons
+    convert_buttons = converter.button_ref_list[:2]
+
+    try:
+        for count in range(interactions):
+            converter.temp_entry.delete(0, "end")
+            converter.temp_entry.insert(0, INPUTS[count % len(INPUTS)])
+            timed("convert", convert_buttons[count % 2].invoke)
+
+            if count % WINDOW_EVERY == WINDOW_EVERY - 1:
+                help_box = timed("open help", lambda: gui.DisplayHelp(converter))
+                timed("close help", help_box.dismiss_button.invoke)
+
+                history_box = timed("open history",
+                                    lambda: gui.HistoryExport(converter,
+                                                              converter.all_calculations))
+                timed("close history", lambda: history_box.close_history(converter))
+    finally:
+        converter.all_calculations.close()
+
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temperature converter GUI latency benchmark")
+    parser.add_argument("--module", default="B_01_Temp_Gui_v2",
+                        help="GUI module to test (default: B_01_Temp_Gui_v2)")
+    parser.add_argument("--interactions", type=int, default=5000,
+                        help="number of conversions (default: 5000)")
+    parser.add_argument("--convert-budget", type=float, default=CONVERT_BUDGET,
+                        help=f"99th percentile budget for a conversion, in ms "
+                             f"(default: {CONVERT_BUDGET:g})")
+    parser.add_argument("--window-budget", type=float, default=WINDOW_BUDGET,
+                        help=f"99th percentile budget for opening / closing a window "
+                             f"or creating the Converter, in ms (default: {WINDOW_BUDGET:g})")
+    args = parser.parse_args(argv)
+
+    xvfb = None
+    if os.name != "nt" and not os.environ.get("DISPLAY"):
+        xvfb = start_virtual_display()
+        if xvfb is None:
+            print("NOT RUN - no display available and Xvfb is not installed")
+            return 2
+
+    from tkinter import Tk
+
+    gui = importlib.import_module(args.module)
+
+    # keeps the test calculations out of the real history
+    temp_dir = tempfile.TemporaryDirectory()
+    c.HISTORY_JOURNAL = os.path.join(temp_dir.name, "history.journal")
+    c.HISTORY_DATABASE = None
+
+    root = Tk()
+    try:
+        times = run_interactions(gui, root, args.interactions)
+    finally:
+        root.destroy()
+        temp_dir.cleanup()
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    passed = True
+    print(f"{'interaction':<18}{'count':>7}{'median':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+          f"{'budget':>9}  (ms)")
+    for name, name_times in times.items():
+        if not name_times:
+            continue
+
+        budget = args.convert_budget if name == "convert" else args.window_budget
+        count, median, p95, p99, slowest = summary(name_times)
+        result = "ok" if p99 <= budget else "OVER"
+        passed = passed and p99 <= budget
+        print(f"{name:<18}{count:>7}{median:>9.2f}{p95:>9.2f}{p99:>9.2f}{slowest:>9.2f}"
+              f"{budget:>9.1f}  {result}")
+
+    if not passed:
+        print("FAIL - an interaction is over its budget")
+        return 1
+
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import argparse
+import io
+import time
+import all_constants as c
+import conversion_log as cl
+import conversion_rounding as cr
+import history_store as hs
+
+# Benchmark - conversion latency as the history grows to 10^6 calculations
+# (the non-GUI part of Converter.convert: convert, build statement, store, log)
+# Run with: python bench_history_growth.py [--size 1000000] [--logging]
+
+SAMPLE = 10000
+
+
+def convert_once(history, to_convert):
+    """
+    Does the same work as Converter.convert, without the widgets
+    """
+
+    answer = cr.to_fahrenheit_num(to_convert)
+    answer_statement = hs.make_statement(to_convert, c.TO_FAHRENHEIT, answer)
+    history.append(to_convert, c.TO_FAHRENHEIT, answer)
+
+    if cl.enabled(cl.DEBUG):
+        cl.log_event("convert", value=to_convert, direction=c.TO_FAHRENHEIT, answer=answer,
+                     history=history.total)
+
+    return answer_statement
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversion latency vs history size")
+    parser.add_argument("--size", type=int, default=1000000, help="largest history size")
+    parser.add_argument("--logging", action="store_true",
+                        help="switch debug logging on (rate limited, to a throwaway stream)")
+    args = parser.parse_args(argv)
+
+    if args.logging:
+        cl.setup_logging("DEBUG", stream=io.StringIO())
+
+    history = hs.HistoryStore(c.HISTORY_CAP)
+    checkpoints = [10 ** power for power in range(4, 10) if 10 ** power <= args.size]
+
+    print(f"{'history size':>14}{'ns / conversion':>18}")
+    first = None
+    for checkpoint in checkpoints:
+        # grow the history to the checkpoint, then time a sample of conversions there
+        while history.total < checkpoint - SAMPLE:
+            convert_once(history, 21.5)
+
+        start = time.perf_counter()
+        for count in range(SAMPLE):
+            convert_once(history, count * 0.5)
+        per_call = (time.perf_counter() - start) / SAMPLE * 1e9
+
+        if first is None:
+            first = per_call
+        print(f"{history.total:>14}{per_call:>18.0f}")
+
+    print(f"slowdown from smallest to largest history: {per_call / first:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import random
+import timeit
+import all_constants as c
+import conversion_rounding as cr
+import conversion_table as ct
+
+# Benchmark - lookup table vs arithmetic, for single (GUI) and batch (bulk) conversions
+# Run with: python bench_lookup_table.py [--size 100000] [--whole 0.9]
+
+REPEATS = 5
+
+
+def make_values(size, whole_share):
+    """
+    Made up readings - `whole_share` of them are whole degrees, the rest have fractions
+    """
+
+    values = []
+    for count in range(size):
+        if random.random() < whole_share:
+            values.append(float(random.randint(-400, 3000)))
+        else:
+            values.append(round(random.uniform(-400, 3000), 2))
+    return values
+
+
+def best_time(func):
+    return min(timeit.repeat(func, number=1, repeat=REPEATS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lookup table benchmark")
+    parser.add_argument("--size", type=int, default=100000, help="readings per run")
+    parser.add_argument("--whole", type=float, default=0.9,
+                        help="share of readings that are whole degrees (0 - 1)")
+    args = parser.parse_args(argv)
+
+    values = make_values(args.size, args.whole)
+    table = ct.ConversionTable()
+
+    start = timeit.default_timer()
+    table.table(c.TO_CELSIUS)
+    table.table(c.TO_FAHRENHEIT)
+    print(f"building both tables: {(timeit.default_timer() - start) * 1000:.1f} ms")
+    print(f"{args.size} readings, {args.whole:.0%} whole degrees, "
+          f"NumPy {'on' if cr.np is not None else 'off'}")
+    print(f"{'conversion':<26}{'arithmetic (ns)':>17}{'table (ns)':>12}{'speed up':>10}")
+
+    # name | direction | arithmetic single | arithmetic batch
+    tests = [
+        ["to_celsius", c.TO_CELSIUS, cr.to_celsius_num, cr.to_celsius_batch],
+        ["to_fahrenheit", c.TO_FAHRENHEIT, cr.to_fahrenheit_num, cr.to_fahrenheit_batch],
+    ]
+
+    for name, direction, single, batch in tests:
+        arithmetic = best_time(lambda: [single(value) for value in values])
+        lookup = best_time(lambda: [table.convert(value, direction) for value in values])
+        print(f"{name + ' (single)':<26}{arithmetic / args.size * 1e9:>17.0f}"
+              f"{lookup / args.size * 1e9:>12.0f}{arithmetic / lookup:>9.2f}x")
+
+        arithmetic = best_time(lambda: batch(values))
+        lookup = best_time(lambda: table.convert_batch(values, direction))
+        print(f"{name + ' (batch)':<26}{arithmetic / args.size * 1e9:>17.0f}"
+              f"{lookup / args.size * 1e9:>12.0f}{arithmetic / lookup:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import timeit
+import conversion_rounding as cr
+
+# Benchmark - numeric conversion layer vs. string returning conversions
+# Run with: python bench_numeric_core.py
+
+TEST_VALUES = [-459, -40, 0, 10.5, 37.5, 100, 212, 1000.25]
+REPEATS = 5
+LOOPS = 20000
+
+
+def time_per_call(func):
+    """
+    Times a conversion function over the test values
+    :param func: Conversion function to time
+    :return: Best time per call in nanoseconds
+    """
+
+    def run():
+        for item in TEST_VALUES:
+            func(item)
+
+    best = min(timeit.repeat(run, number=LOOPS, repeat=REPEATS))
+    return best / (LOOPS * len(TEST_VALUES)) * 1e9
+
+
+def main():
+    pairs = [
+        ["to_celsius", cr.to_celsius, cr.to_celsius_num],
+        ["to_fahrenheit", cr.to_fahrenheit, cr.to_fahrenheit_num],
+    ]
+
+    print(f"{'function':<16}{'string (ns)':>14}{'numeric (ns)':>14}{'saving':>10}")
+    for name, string_func, num_func in pairs:
+        string_time = time_per_call(string_func)
+        num_time = time_per_call(num_func)
+        saving = (1 - num_time / string_time) * 100
+        print(f"{name:<16}{string_time:>14.1f}{num_time:>14.1f}{saving:>9.0f}%")
+
+
+if __name__ == "__main__":
+    main()
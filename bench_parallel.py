@@ -0,0 +1,54 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import parallel_convert as pc
+
+# Benchmark - parallel bulk conversion scaling from 1 worker up to one per CPU
+# Run with: python bench_parallel.py [--rows 2000000] [--max-workers N]
+
+
+def make_readings(file_name, rows):
+    """
+    Writes a CSV of random readings to convert
+    """
+
+    with open(file_name, "w") as out_file:
+        for start in range(0, rows, 10000):
+            lines = [f"{random.uniform(-400, 2000):.2f},sensor_{count % 50}\n"
+                     for count in range(start, min(start + 10000, rows))]
+            out_file.writelines(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel conversion scaling benchmark")
+    parser.add_argument("--rows", type=int, default=2000000, help="readings to convert")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                        help="largest number of workers to try")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        in_name = os.path.join(temp_dir, "readings.csv")
+        out_name = os.path.join(temp_dir, "converted.csv")
+        make_readings(in_name, args.rows)
+
+        print(f"{args.rows} rows, {os.path.getsize(in_name) / 1e6:.0f} MB")
+        print(f"{'workers':>8}{'seconds':>10}{'rows/s':>14}{'speed up':>10}")
+
+        single_time = None
+        for workers in range(1, args.max_workers + 1):
+            start = time.perf_counter()
+            with open(out_name, "w", newline="") as out_file:
+                pc.convert_file_parallel(in_name, out_file, "celsius", workers,
+                                         chunk_bytes=pc.CHUNK_BYTES // 4)
+            seconds = time.perf_counter() - start
+
+            if single_time is None:
+                single_time = seconds
+            print(f"{workers:>8}{seconds:>10.2f}{args.rows / seconds:>14,.0f}"
+                  f"{single_time / seconds:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import random
+import timeit
+from decimal import Decimal, ROUND_FLOOR, ROUND_HALF_EVEN
+import conversion_rounding as cr
+import conversion_units as cu
+
+# Benchmark - the rounding modes and precisions, each with its own fast path,
+# against a generic Decimal.quantize version of the same rounding
+# Run with: python bench_rounding.py [--size 100000]
+
+REPEATS = 5
+
+
+def make_values(size, seed=1):
+    """
+    Made up temperatures with up to 3 decimal places (some of them ties)
+    """
+
+    rng = random.Random(seed)
+    return [rng.randint(-200000, 1000000) / 1000 for count in range(size)]
+
+
+def decimal_rounder(places, mode):
+    """
+    Generic rounding with the decimal module (the slow path the modes avoid)
+    """
+
+    quantum = Decimal(1).scaleb(-places)
+
+    if mode == cr.HALF_UP:
+        # ties go up (towards +infinity, like round_num), which is Decimal's
+        # ROUND_HALF_UP only for positive numbers
+        half = quantum / 2
+
+        def round_decimal(val):
+            return float((Decimal(repr(val)) + half).quantize(quantum, rounding=ROUND_FLOOR))
+
+    else:
+        def round_decimal(val):
+            return float(Decimal(repr(val)).quantize(quantum, rounding=ROUND_HALF_EVEN))
+
+    return round_decimal
+
+
+def time_func(func, values):
+    """
+    :return: Nanoseconds per value (best of REPEATS)
+    """
+
+    seconds = min(timeit.repeat(lambda: func(values), number=1, repeat=REPEATS))
+    return seconds / len(values) * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rounding modes benchmark")
+    parser.add_argument("--size", type=int, default=100000, help="values per batch")
+    args = parser.parse_args(argv)
+
+    values = make_values(args.size)
+    conversion = cu.plan("celsius", "fahrenheit")
+
+    print(f"{args.size} values, ns per value (NumPy: {'yes' if cr.np is not None else 'no'})")
+    print(f"{'mode':<12}{'places':>7}{'round':>10}{'batch':>10}{'C -> F':>10}"
+          f"{'Decimal':>10}{'speed-up':>10}{'differ':>8}")
+
+    for mode in cr.ROUNDING_MODES:
+        for places in cr.PLACES:
+            round_func = cr.rounder(places, mode)
+            convert_func = conversion.rounder(places, mode)
+            decimal_func = decimal_rounder(places, mode)
+
+            # ties are decided on the float after scaling, so a few typed ties
+            # (e.g. 521.055 * 100) can go the other way to Decimal
+            differ = sum(map(float.__ne__, map(round_func, values), map(decimal_func, values)))
+
+            times = [
+                time_func(lambda items: list(map(round_func, items)), values),
+                time_func(lambda items: cr.round_batch(items, places, mode), values),
+                time_func(lambda items: list(map(convert_func, items)), values),
+                time_func(lambda items: list(map(decimal_func, items)), values),
+            ]
+
+            print(f"{mode:<12}{places:>7}" + "".join(f"{time:>10.0f}" for time in times)
+                  + f"{times[3] / times[0]:>9.1f}x{differ:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import bench_gui_latency as bgl
+
+# Benchmark - cold start time (fresh interpreter, import GUI module, first Tk frame drawn)
+# Starts a virtual display (Xvfb) if there is no display.
+# Run with: python bench_startup.py [--module B_01_Temp_Gui_v2] [--threshold 1.5]
+# Exits with status 1 if the median start up time is over the threshold, and
+# status 2 if it couldn't be run (no display and no Xvfb)
+
+# runs in a fresh interpreter so nothing is already imported / cached. The
+# history is saved to a temporary folder (made by the parent process), not the
+# real journal - it is pointed there once all_constants has been imported, so
+# that import is still timed
+CHILD_SCRIPT = """
+import time
+start = time.perf_counter()
+import all_constants as c
+c.HISTORY_JOURNAL = {journal!r}
+c.HISTORY_DATABASE = None
+
+import importlib
+from tkinter import Tk
+gui = importlib.import_module({module!r})
+root = Tk()
+converter = gui.Converter()
+root.update()
+print(time.perf_counter() - start)
+
+# older GUIs keep their history in a plain list
+history = getattr(converter, "all_calculations", None)
+if hasattr(history, "close"):
+    history.close()
+root.destroy()
+"""
+
+
+def time_startup(module):
+    """
+    Starts the GUI in a new interpreter and times it
+    :param module: Name of the GUI module to start (must have a Converter class)
+    :return: (seconds from import to first frame drawn, seconds for the whole process)
+    """
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        script = CHILD_SCRIPT.format(module=module,
+                                     journal=os.path.join(temp_dir, "history.journal"))
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", script],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        process_time = time.perf_counter() - start
+
+    # the GUI modules should not print anything while starting up
+    lines = result.stdout.split()
+    if len(lines) != 1:
+        print(f"Warning: {module} printed to stdout while starting up")
+
+    return float(lines[-1]), process_time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temperature converter start up benchmark")
+    parser.add_argument("--module", default="B_01_Temp_Gui_v2",
+                        help="GUI module to start (default: B_01_Temp_Gui_v2)")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to time")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="maximum allowed median start up time in seconds")
+    args = parser.parse_args(argv)
+
+    xvfb = None
+    if os.name != "nt" and not os.environ.get("DISPLAY"):
+        xvfb = bgl.start_virtual_display()
+        if xvfb is None:
+            print("NOT RUN - no display available and Xvfb is not installed")
+            return 2
+
+    first_frame_times = []
+    process_times = []
+    try:
+        for run in range(args.runs):
+            first_frame, process = time_startup(args.module)
+            first_frame_times.append(first_frame)
+            process_times.append(process)
+            print(f"run {run + 1}: first frame {first_frame * 1000:.1f} ms, "
+                  f"whole process {process * 1000:.1f} ms")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    median_time = statistics.median(first_frame_times)
+    print(f"median first frame: {median_time * 1000:.1f} ms "
+          f"(threshold {args.threshold * 1000:.0f} ms)")
+    print(f"median whole process: {statistics.median(process_times) * 1000:.1f} ms")
+
+    if median_time > args.threshold:
+        print("FAIL - start up time is over the threshold")
+        return 1
+
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
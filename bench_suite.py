@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import all_constants as c
+import bench_gui_latency as bgl
+import conversion_rounding as cr
+import history_export as he
+import history_store as hs
+import history_view as hv
+
+# Benchmark suite - times the conversion functions, input checking, drawing
+# the history box's list and history export at several sizes, and saves the results as
+# JSON so runs from different commits can be compared.
+# Run with: python bench_suite.py [--sizes 1000 10000 100000] [-o results.json]
+#           python bench_suite.py --compare old.json [--threshold 1.10]
+
+SIZES = [1000, 10000, 100000]
+
+# best of this many runs is kept for each benchmark
+REPEATS = 5
+
+# a benchmark is a regression if it is this many times slower than before
+THRESHOLD = 1.10
+
+
+def make_values(size):
+    """
+    Made up temperatures (half degrees from -300 to 700)
+    """
+    return [(count % 2000) * 0.5 - 300 for count in range(size)]
+
+
+def make_history(size):
+    """
+    Fills a history store with `size` made up calculations
+    """
+
+    history = hs.HistoryStore(max(size, 1))
+    start = time.time()
+    for count, value in enumerate(make_values(size)):
+        if count % 2:
+            history.append(value, c.TO_CELSIUS, cr.to_celsius_num(value), start + count)
+        else:
+            history.append(value, c.TO_FAHRENHEIT, cr.to_fahrenheit_num(value), start + count)
+
+    return history
+
+
+def bench_round_ans(size):
+    values = make_values(size)
+
+    def run():
+        for value in values:
+            cr.round_ans(value)
+
+    return run, None
+
+
+def bench_to_celsius(size):
+    values = make_values(size)
+
+    def run():
+        for value in values:
+            cr.to_celsius(value)
+
+    return run, None
+
+
+def bench_to_fahrenheit(size):
+    values = make_values(size)
+
+    def run():
+        for value in values:
+            cr.to_fahrenheit(value)
+
+    return run, None
+
+
+def bench_check_temp(size):
+    # same checks as Converter.check_temp, without the GUI
+    # typed in temperatures from the GUI latency benchmark
+    inputs = [bgl.INPUTS[count % len(bgl.INPUTS)] for count in range(size)]
+
+    def run():
+        for text in inputs:
+            cr.validate_temp(text, c.ABS_ZERO_CELSIUS)
+
+    return run, None
+
+
+def bench_history_window(size):
+    # the rows the history box draws, scrolling from the newest to the oldest
+    # calculation a window at a time
+    history = make_history(size)
+    rows = hv.VISIBLE_ROWS
+
+    def run():
+        for top in range(0, size, rows):
+            hv.window_statements(history, top, rows)
+
+    return run, None
+
+
+def bench_export(size):
+    history = make_history(size)
+    temp_dir = tempfile.TemporaryDirectory()
+    file_name = os.path.join(temp_dir.name, "history.txt")
+
+    def run():
+        he.export_history(history.iter_records(), file_name)
+
+    return run, temp_dir.cleanup
+
+
+# name | function that sets up a benchmark for a size (returns run, cleanup)
+BENCHMARKS = [
+    ["round_ans", bench_round_ans],
+    ["to_celsius", bench_to_celsius],
+    ["to_fahrenheit", bench_to_fahrenheit],
+    ["check_temp", bench_check_temp],
+    ["history_window", bench_history_window],
+    ["export_data", bench_export],
+]
+
+
+def time_best(run, repeats=REPEATS):
+    """
+    Runs a benchmark several times
+    :return: Fastest run in seconds
+    """
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+
+    return best
+
+
+def git_commit():
+    """
+    Short hash of the checked out commit (None if git isn't available)
+    """
+
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    return result.stdout.strip() or None
+
+
+def run_suite(sizes=SIZES, names=None, repeats=REPEATS):
+    """
+    Runs the benchmarks
+    :param sizes: Numbers of items to time each benchmark with
+    :param names: Benchmarks to run (default: all)
+    :param repeats: Runs per benchmark (the fastest is kept)
+    :return: Results dictionary (saved as JSON)
+    """
+
+    results = {}
+    for name, setup in BENCHMARKS:
+        if names and name not in names:
+            continue
+
+        for size in sizes:
+            run, cleanup = setup(size)
+            try:
+                seconds = time_best(run, repeats)
+            finally:
+                if cleanup is not None:
+                    cleanup()
+
+            results[f"{name}/{size}"] = {
+                "name": name,
+                "size": size,
+                "seconds": seconds,
+                "ns_per_item": seconds / size * 1e9,
+            }
+            print(f"{name:<20}{size:>10}{seconds:>12.4f}{seconds / size * 1e9:>14.1f}",
+                  file=sys.stderr)
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": cr.np is not None,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeats": repeats,
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=THRESHOLD):
+    """
+    Compares two sets of results
+    :param old: Results from the earlier run
+    :param new: Results from this run
+    :param threshold: Ratio (new / old time) that counts as a regression
+    :return: List of (benchmark, old seconds, new seconds, ratio) for the regressions
+    """
+
+    regressions = []
+
+    print(f"{'benchmark':<30}{'old (s)':>12}{'new (s)':>12}{'ratio':>8}")
+    for key, result in new["results"].items():
+        before = old["results"].get(key)
+        if before is None:
+            continue
+
+        ratio = result["seconds"] / before["seconds"]
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"{key:<30}{before['seconds']:>12.4f}{result['seconds']:>12.4f}"
+              f"{ratio:>8.2f}{flag}")
+
+        if ratio > threshold:
+            regressions.append((key, before["seconds"], result["seconds"], ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temperature converter benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help=f"items per benchmark (default: {' '.join(map(str, SIZES))})")
+    parser.add_argument("--only", nargs="+", choices=[item[0] for item in BENCHMARKS],
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=REPEATS,
+                        help=f"runs per benchmark, fastest kept (default: {REPEATS})")
+    parser.add_argument("-o", "--output", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results from an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"slow-down ratio that counts as a regression "
+                             f"(default: {THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    print(f"{'benchmark':<20}{'size':>10}{'seconds':>12}{'ns/item':>14}", file=sys.stderr)
+    results = run_suite(args.sizes, args.only, args.repeats)
+
+    if args.output:
+        with open(args.output, "w") as out_file:
+            json.dump(results, out_file, indent=2)
+            out_file.write("\n")
+
+    if args.compare:
+        with open(args.compare) as in_file:
+            old = json.load(in_file)
+
+        regressions = compare(old, results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:g}x", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import mmap
+import os
+import sys
+from array import array
+import bulk_convert as bc
+import conversion_rounding as cr
+
+# Binary dump conversion - memory-maps raw little-endian float32 / float64 files
+# from the loggers and converts them in place or into a new file of the same type.
+# Readings below absolute zero (or NaN) can't be converted and are written as NaN.
+
+# element type name | struct / array code | bytes per reading
+DTYPES = {
+    "float32": ["f", 4],
+    "float64": ["d", 8],
+}
+
+# readings converted at a time
+BLOCK_SIZE = 1024 * 1024
+
+NAN = float("nan")
+
+
+def convert_binary(in_name, direction, dtype="float32", out_name=None, block_size=BLOCK_SIZE):
+    """
+    Converts a raw binary dump of readings
+    :param in_name: File of little-endian float32 / float64 readings
+    :param direction: "celsius" or "fahrenheit" (the scale to convert to)
+    :param dtype: "float32" or "float64"
+    :param out_name: File to write the answers to (None converts the input in place)
+    :param block_size: Number of readings converted at a time
+    :return: (readings converted, readings below absolute zero / NaN)
+    """
+
+    min_temp, batch_func = bc.DIRECTIONS[direction]
+    code, item_size = DTYPES[dtype]
+
+    file_size = os.path.getsize(in_name)
+    if file_size % item_size != 0:
+        raise ValueError(f"{in_name} is not a whole number of {dtype} readings")
+    if file_size == 0:
+        if out_name is not None:
+            open(out_name, "wb").close()
+        return 0, 0
+
+    in_file = open(in_name, "rb" if out_name is not None else "r+b")
+    out_file = None
+    try:
+        if out_name is None:
+            in_map = out_map = mmap.mmap(in_file.fileno(), 0)
+        else:
+            in_map = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+            out_file = open(out_name, "w+b")
+            out_file.truncate(file_size)
+            out_map = mmap.mmap(out_file.fileno(), 0)
+
+        if cr.np is not None:
+            totals = _convert_numpy(in_map, out_map, code, min_temp, batch_func, block_size)
+        else:
+            totals = _convert_python(in_map, out_map, code, min_temp, batch_func, block_size)
+
+        out_map.flush()
+        if out_map is not in_map:
+            out_map.close()
+        in_map.close()
+
+    finally:
+        in_file.close()
+        if out_file is not None:
+            out_file.close()
+
+    return totals
+
+
+def _convert_numpy(in_map, out_map, code, min_temp, batch_func, block_size):
+    """
+    Converts mapped readings with NumPy views of the maps (no Python float objects)
+    """
+
+    np = cr.np
+    dtype = np.dtype("<" + code)
+    readings = np.frombuffer(in_map, dtype=dtype)
+    answers = np.frombuffer(out_map, dtype=dtype)
+
+    invalid = 0
+    for start in range(0, len(readings), block_size):
+        block = readings[start:start + block_size]
+
+        # the maths is done in float64, like the GUI, then stored as the file's type
+        converted = batch_func(block)
+        bad = ~(block >= min_temp)
+        converted[bad] = np.nan
+        invalid += int(bad.sum())
+
+        answers[start:start + block_size] = converted
+
+    return len(in_map) // dtype.itemsize - invalid, invalid
+
+
+def _convert_python(in_map, out_map, code, min_temp, batch_func, block_size):
+    """
+    Converts mapped readings block by block without NumPy
+    """
+
+    swap = sys.byteorder != "little"
+    in_view = memoryview(in_map).cast("B").cast(code)
+    out_view = memoryview(out_map).cast("B").cast(code)
+
+    invalid = 0
+    for start in range(0, len(in_view), block_size):
+        block = in_view[start:start + block_size]
+        if swap:
+            block = array(code, block.tobytes())
+            block.byteswap()
+
+        answers = array(code, batch_func(block))
+        for index, reading in enumerate(block):
+            if not reading >= min_temp:
+                answers[index] = NAN
+                invalid += 1
+
+        if swap:
+            answers.byteswap()
+        out_view[start:start + len(answers)] = answers
+
+    total = len(in_view)
+    in_view.release()
+    out_view.release()
+    return total - invalid, invalid
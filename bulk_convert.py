@@ -0,0 +1,226 @@
+import argparse
+import csv
+import sys
+import time
+from itertools import compress, islice
+import all_constants as c
+import bulk_errors as be
+import bulk_parse as bp
+import conversion_rounding as cr
+import conversion_table as ct
+
+# Headless bulk converter - streams a CSV / TSV of readings through the
+# same checks as Converter.check_temp and writes the answers in chunks.
+# Run with: python bulk_convert.py celsius readings.csv -o converted.csv
+
+# rows read, converted and written at a time (memory use depends on this, not the file size)
+CHUNK_SIZE = 10000
+
+# write buffer for the output file
+BUFFER_SIZE = 1024 * 1024
+
+# direction (convert to...) | lowest allowed input | batch conversion function
+# (whole degrees are looked up in conversion_table, the rest are calculated)
+DIRECTIONS = {
+    "celsius": [c.ABS_ZERO_FAHRENHEIT, ct.to_celsius_batch],
+    "fahrenheit": [c.ABS_ZERO_CELSIUS, ct.to_fahrenheit_batch],
+}
+
+
+def convert_rows(rows, direction, column=0, chunk_size=CHUNK_SIZE):
+    """
+    Converts rows of readings a chunk at a time
+    :param rows: Iterable of rows (lists of strings), e.g. a csv.reader
+    :param direction: "celsius" or "fahrenheit" (the scale to convert to)
+    :param column: Index of the column holding the temperature
+    :param chunk_size: Number of rows to convert at a time
+    :return: Generator of (converted rows, errors) for each chunk. Converted rows have
+             the answer added as an extra column. Errors are (row number, raw value,
+             error kind) for rows that failed the checks and were left out - the kind is
+             bp.NOT_A_NUMBER or bp.TOO_COLD (see bp.error_messages for the messages).
+    """
+
+    min_temp, batch_func = DIRECTIONS[direction]
+
+    rows = iter(rows)
+    first_row = 1
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        # the whole chunk is checked at once (see bulk_parse)
+        raws = [row[column] if column < len(row) else "" for row in chunk]
+        numbers, valid, errors = bp.parse_values(raws, min_temp)
+
+        answers = batch_func(bp.valid_numbers(numbers, valid))
+        good_rows = list(compress(chunk, valid))
+        for row, answer in zip(good_rows, answers):
+            row.append(cr.format_ans(answer))
+
+        yield good_rows, [(first_row + index, raws[index], kind) for index, kind in errors]
+        first_row += len(chunk)
+
+
+def convert_stream(in_file, out_file, direction, delimiter=",", column=0,
+                   header=False, chunk_size=CHUNK_SIZE, report=None):
+    """
+    Converts a whole CSV / TSV stream, writing the answers as it goes
+    :param in_file: Text file to read (opened with newline="")
+    :param out_file: Text file to write (opened with newline="")
+    :param direction: "celsius" or "fahrenheit" (the scale to convert to)
+    :param delimiter: Column separator ("," for CSV, tab for TSV)
+    :param column: Index of the column holding the temperature
+    :param header: True if the first row is a header (copied, not converted)
+    :param chunk_size: Number of rows to convert / write at a time
+    :param report: Optional bulk_errors.ErrorReport to send each chunk's errors to
+                   (raises bulk_errors.ErrorBudgetExceeded if its budget runs out)
+    :return: (rows converted, rows with errors)
+    """
+
+    reader = csv.reader(in_file, delimiter=delimiter)
+    writer = csv.writer(out_file, delimiter=delimiter, lineterminator="\n")
+
+    if header:
+        header_row = next(reader, None)
+        if header_row is not None:
+            writer.writerow(header_row + [direction])
+
+    converted = 0
+    invalid = 0
+    for out_rows, errors in convert_rows(reader, direction, column, chunk_size):
+        writer.writerows(out_rows)
+        converted += len(out_rows)
+        invalid += len(errors)
+        if report is not None:
+            report.add(len(out_rows) + len(errors), errors)
+
+    return converted, invalid
+
+
+def guess_delimiter(file_name):
+    """
+    Picks the column separator from the file extension (tab for .tsv, otherwise comma)
+    """
+
+    if file_name is not None and file_name.lower().endswith(".tsv"):
+        return "\t"
+    return ","
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a CSV / TSV of temperature readings")
+    parser.add_argument("direction", choices=sorted(DIRECTIONS),
+                        help="scale to convert to")
+    parser.add_argument("input", nargs="?", help="file to read (default: stdin)")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    parser.add_argument("-d", "--delimiter",
+                        help="column separator (default: tab for .tsv files, otherwise comma)")
+    parser.add_argument("-c", "--column", type=int, default=0,
+                        help="index of the temperature column (default: 0)")
+    parser.add_argument("--header", action="store_true",
+                        help="first row is a header and is not converted")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"rows converted at a time (default: {CHUNK_SIZE})")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes to convert a file with (0 = one per CPU, "
+                             "default: 1)")
+    parser.add_argument("-e", "--errors",
+                        help="write a row | value | error record for each invalid row "
+                             "to this CSV file")
+    parser.add_argument("--max-errors", type=int,
+                        help="stop once there are more than this many invalid rows")
+    parser.add_argument("--max-error-rate", type=float,
+                        help="stop once more than this share of the rows are invalid "
+                             f"(e.g. 0.01 for 1%%, checked after {be.RATE_MIN_ROWS} rows)")
+    parser.add_argument("-b", "--binary", choices=["float32", "float64"],
+                        help="input is a raw little-endian binary dump of this type")
+    parser.add_argument("--in-place", action="store_true",
+                        help="with --binary, convert the input file in place")
+    args = parser.parse_args(argv)
+
+    if args.binary is not None:
+        return binary_main(parser, args)
+
+    if args.workers != 1 and args.input is None:
+        parser.error("--workers needs an input file (stdin can't be split up)")
+
+    delimiter = args.delimiter or guess_delimiter(args.input)
+    if delimiter == "\\t":
+        delimiter = "\t"
+
+    if args.input is None:
+        in_file = open(sys.stdin.fileno(), newline="", closefd=False)
+    else:
+        in_file = open(args.input, newline="")
+
+    if args.output is None:
+        out_file = open(sys.stdout.fileno(), "w", newline="", closefd=False,
+                        buffering=BUFFER_SIZE)
+    else:
+        out_file = open(args.output, "w", newline="", buffering=BUFFER_SIZE)
+
+    report = be.ErrorReport(args.errors, args.max_errors, args.max_error_rate)
+
+    start = time.perf_counter()
+    try:
+        with in_file, out_file:
+            if args.workers == 1:
+                converted, invalid = convert_stream(in_file, out_file, args.direction,
+                                                    delimiter, args.column, args.header,
+                                                    args.chunk_size, report)
+            else:
+                # imported here as parallel_convert imports this module
+                import parallel_convert as pc
+                converted, invalid = pc.convert_file_parallel(args.input, out_file,
+                                                              args.direction,
+                                                              args.workers or None, delimiter,
+                                                              args.column, args.header,
+                                                              report=report)
+    except be.ErrorBudgetExceeded as error:
+        print(f"Stopped - {error} ({report.summary()}). The output is incomplete.",
+              file=sys.stderr)
+        return 1
+    finally:
+        report.close()
+    seconds = time.perf_counter() - start
+
+    # report on stderr so it doesn't end up in the converted output
+    total = converted + invalid
+    rate = total / seconds if seconds > 0 else 0
+    print(f"{total} rows read, {converted} converted, {invalid} invalid "
+          f"in {seconds:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+    if invalid:
+        print(f"invalid rows: {report.summary()}", file=sys.stderr)
+
+    return 0
+
+
+def binary_main(parser, args):
+    """
+    Runs the --binary mode of the command line (memory-mapped binary dumps)
+    """
+
+    if args.input is None:
+        parser.error("--binary needs an input file (stdin can't be memory-mapped)")
+    if args.output is None and not args.in_place:
+        parser.error("--binary needs --output or --in-place")
+
+    # imported here as binary_convert imports this module
+    import binary_convert as bin_c
+
+    start = time.perf_counter()
+    converted, invalid = bin_c.convert_binary(args.input, args.direction, args.binary,
+                                              args.output)
+    seconds = time.perf_counter() - start
+
+    total = converted + invalid
+    rate = total / seconds if seconds > 0 else 0
+    print(f"{total} readings read, {converted} converted, {invalid} below absolute zero "
+          f"in {seconds:.2f}s ({rate:,.0f} readings/s)", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import csv
+import bulk_parse as bp
+
+# Error reporting for bulk conversions - every row that fails the checks is
+# written to a side file as a compact record (row number | raw value | error
+# kind) while the conversion runs, and an error budget stops a conversion of a
+# badly corrupted file early instead of after reading all of it.
+
+# error kind written to the side file (bp.NOT_A_NUMBER | bp.TOO_COLD) - the
+# same two checks as Converter.check_temp ("Please enter a number" |
+# "Enter a number more than / equal to ...")
+KIND_NAMES = ["", "not_a_number", "too_cold"]
+
+# the error rate is only checked once this many rows have been read
+RATE_MIN_ROWS = 1000
+
+
+class ErrorBudgetExceeded(Exception):
+    """
+    Raised when a bulk conversion has more errors than its budget allows
+    """
+
+
+class ErrorReport:
+    """
+    Collects the errors from a bulk conversion, one chunk at a time
+    """
+
+    def __init__(self, file_name=None, max_errors=None, max_error_rate=None):
+        """
+        :param file_name: Side file to write the error records to (None for no file)
+        :param max_errors: Most rows with errors before the conversion stops (None for no limit)
+        :param max_error_rate: Highest share of rows with errors, e.g. 0.01 for 1%
+                               (checked after RATE_MIN_ROWS rows, None for no limit)
+        """
+
+        self.max_errors = max_errors
+        self.max_error_rate = max_error_rate
+
+        self.rows = 0
+        self.errors = 0
+        self.counts = [0] * len(KIND_NAMES)
+
+        self.out_file = None
+        self.writer = None
+        if file_name is not None:
+            self.out_file = open(file_name, "w", newline="")
+            self.writer = csv.writer(self.out_file, lineterminator="\n")
+            self.writer.writerow(["row", "value", "error"])
+
+    def add(self, rows, errors):
+        """
+        Records the errors from one chunk and checks the budget
+        :param rows: Number of rows in the chunk
+        :param errors: List of (row number, raw value, error kind)
+        :raises ErrorBudgetExceeded: if there are now too many errors
+        """
+
+        self.rows += rows
+        self.errors += len(errors)
+        for error in errors:
+            self.counts[error[2]] += 1
+
+        if self.writer is not None and errors:
+            self.writer.writerows([row_number, raw, KIND_NAMES[kind]]
+                                  for row_number, raw, kind in errors)
+
+        if self.max_errors is not None and self.errors > self.max_errors:
+            raise ErrorBudgetExceeded(f"{self.errors} invalid rows in the first {self.rows} "
+                                      f"(budget: {self.max_errors})")
+
+        if (self.max_error_rate is not None and self.rows >= RATE_MIN_ROWS
+                and self.errors > self.max_error_rate * self.rows):
+            raise ErrorBudgetExceeded(f"{self.errors / self.rows:.1%} of the first {self.rows} "
+                                      f"rows are invalid (budget: {self.max_error_rate:.1%})")
+
+    def summary(self):
+        """
+        :return: Errors of each kind, e.g. "12 not_a_number, 3 too_cold"
+        """
+        return ", ".join(f"{self.counts[kind]} {KIND_NAMES[kind]}"
+                         for kind in (bp.NOT_A_NUMBER, bp.TOO_COLD))
+
+    def close(self):
+        """
+        Finishes writing the side file
+        """
+
+        if self.out_file is not None:
+            self.out_file.close()
+            self.out_file = None
+            self.writer = None
@@ -0,0 +1,268 @@
+import math
+import random
+from array import array
+from itertools import compress, repeat
+from operator import le
+import conversion_rounding as cr
+
+# Bulk input parser - checks and converts a whole batch of typed / imported
+# temperatures with the same results as cr.validate_temp (the checks used by
+# Converter.check_temp), without a Python function call per value.
+#
+# Values are converted a chunk at a time with float() at C speed, and a value
+# that isn't a number only stops the conversion for a moment so it can be
+# marked. That is quickest while bad values are rare, but each one raises an
+# exception, so after a messy chunk the next one is first checked for
+# characters float() never accepts, and most of its bad values are found
+# without any exceptions. That check costs more than converting a clean
+# chunk, so it is only used once more than 1 in MESSY_RATE values are bad -
+# below that, bad values are still found with one exception each (see
+# bench_bulk_parse.py).
+#
+# Each value gets an error kind as it is converted, so the valid mask and the
+# list of errors are picked out of the kinds at C speed afterwards.
+
+# error kinds (index into the error_messages list) - 0 is used for valid values
+VALID = 0
+NOT_A_NUMBER = 1
+TOO_COLD = 2
+
+NAN = float("nan")
+
+# the ASCII characters float() accepts - digits, point, sign, exponent,
+# underscores, spaces and the letters of inf / infinity / nan (any case)
+NUMBER_CHARS = "0123456789.+-eE_ \t\n\r\f\viInNfFtTyYaA"
+
+# values converted at a time
+CHUNK_SIZE = 1024
+
+# a chunk is messy if more than 1 in MESSY_RATE of its values aren't numbers
+MESSY_RATE = 5
+
+# errors are picked out at C speed if more than 1 in SCAN_RATE values are invalid
+SCAN_RATE = 3
+
+# byte tables for bytes.translate (error kind -> valid | passed the too cold
+# check -> error kind)
+VALID_TABLE = bytes([1]) + bytes(255)
+COLD_TABLE = bytes([TOO_COLD, VALID]) + bytes(254)
+
+
+def error_messages(min_temp):
+    """
+    The error message for each error kind (same as cr.validate_temp)
+    :return: List (valid | not a number | below absolute zero)
+    """
+    return ["", cr.NOT_A_NUMBER, cr.TOO_COLD.format(min_temp)]
+
+
+def parse_values(values, min_temp):
+    """
+    Checks and converts a batch of temperatures
+    :param values: Sequence of temperatures (usually text - numbers are allowed too)
+    :param min_temp: Lowest allowed temperature (absolute zero for the input scale)
+    :return: (numbers, valid, errors) - numbers is an array.array of the values
+             as floats (NaN where the value isn't a number), valid is a bytearray
+             mask (1 for values that passed the checks) and errors is a list of
+             (index, error kind) for the values that didn't, in order
+    """
+
+    min_temp = float(min_temp)
+    numbers = array("d")
+    kinds = bytearray()
+
+    messy = False
+    for start in range(0, len(values), CHUNK_SIZE):
+        chunk = values[start:start + CHUNK_SIZE]
+        if messy:
+            found = _convert_messy(chunk, min_temp, numbers, kinds)
+        else:
+            found = _convert(chunk, min_temp, numbers, kinds)
+        messy = found * MESSY_RATE > len(chunk)
+
+    count = len(kinds)
+    valid = kinds.translate(VALID_TABLE)
+    invalid = count - valid.count(1)
+    if invalid == 0:
+        return numbers, valid, []
+
+    if invalid * SCAN_RATE > count:
+        # compress(kinds, kinds) gives the kind of each invalid value
+        errors = list(zip(compress(range(count), kinds), compress(kinds, kinds)))
+    else:
+        errors = []
+        index = valid.find(0)
+        while index != -1:
+            errors.append((index, kinds[index]))
+            index = valid.find(0, index + 1)
+
+    return numbers, valid, errors
+
+
+def _convert(chunk, min_temp, numbers, kinds):
+    """
+    Converts a chunk with float() at C speed, stopping only to mark the values
+    that aren't numbers (NaN in numbers, the error kind in kinds)
+    :return: Number of values that aren't numbers
+    """
+
+    start = len(numbers)
+    kinds += bytes(len(chunk))
+
+    items = iter(chunk)
+    try:
+        numbers.extend(map(float, items))
+        found = 0
+    except (ValueError, TypeError):
+        found = 1
+
+    # the values converted in one go are checked together (the total is NaN
+    # if any of them are NaN, which is never >= min_temp)
+    converted = numbers[start:]
+    total = sum(converted)
+    if total != total or (converted and min(converted) < min_temp):
+        kinds[start:len(numbers)] = bytes(map(le, repeat(min_temp),
+                                              converted)).translate(COLD_TABLE)
+
+    if not found:
+        return 0
+
+    kinds[len(numbers)] = NOT_A_NUMBER
+    numbers.append(NAN)
+
+    # an exception raised inside extend() costs about twice as much as one
+    # raised here, so once there is a bad value the rest go one at a time
+    append = numbers.append
+    for item in items:
+        try:
+            value = float(item)
+        except (ValueError, TypeError):
+            kinds[len(numbers)] = NOT_A_NUMBER
+            append(NAN)
+            found += 1
+            continue
+
+        if not value >= min_temp:
+            kinds[len(numbers)] = TOO_COLD
+        append(value)
+
+    return found
+
+
+def _convert_messy(chunk, min_temp, numbers, kinds):
+    """
+    Converts a messy chunk - values with characters float() never accepts are
+    marked without calling float(), so most of the ones that aren't numbers
+    are found without an exception for each of them
+    :return: Number of values that aren't numbers
+    """
+
+    kinds += bytes(len(chunk))
+
+    append = numbers.append
+    strip = str.strip
+    found = 0
+    for item in chunk:
+        try:
+            # text that is left after stripping off the number characters
+            rest = strip(item, NUMBER_CHARS)
+        except TypeError:
+            # not text (e.g. a number from JSON) - left to float()
+            rest = ""
+
+        # non-ASCII digits and spaces (and other unprintable spaces) might
+        # still be a number, so those are left to float() too
+        if item == "" or rest and rest.isascii() and rest.isprintable():
+            kinds[len(numbers)] = NOT_A_NUMBER
+            append(NAN)
+            found += 1
+            continue
+
+        # values that only look like numbers (e.g. "1e" or "--5") still raise
+        try:
+            value = float(item)
+        except (ValueError, TypeError):
+            kinds[len(numbers)] = NOT_A_NUMBER
+            append(NAN)
+            found += 1
+            continue
+
+        if not value >= min_temp:
+            kinds[len(numbers)] = TOO_COLD
+        append(value)
+
+    return found
+
+
+def parse_text(text, min_temp):
+    """
+    Checks and converts a buffer of temperatures, one per line
+    :param text: Text (or UTF-8 bytes) with one temperature per line
+    :param min_temp: Lowest allowed temperature (absolute zero for the input scale)
+    :return: (numbers, valid, errors) as for parse_values - indexes are line numbers
+             counting from 0
+    """
+
+    if isinstance(text, (bytes, bytearray, memoryview)):
+        text = bytes(text).decode("utf-8")
+
+    return parse_values(text.splitlines(), min_temp)
+
+
+def valid_numbers(numbers, valid):
+    """
+    The numbers that passed the checks, ready for a batch conversion function
+    :return: array.array of floats
+    """
+    return array("d", compress(numbers, valid))
+
+
+def verify(batches=300, seed=1):
+    """
+    Self-test - checks parse_values gives the same numbers, valid mask and
+    errors as calling cr.validate_temp on each value, for random batches mixing
+    numbers, text that float() accepts (spaces, underscores, inf / nan, other
+    scripts' digits) and text it doesn't. Only runs when asked for
+    (python bulk_parse.py), not on import.
+    """
+
+    rng = random.Random(seed)
+    good = ["100", "-40", " 21 ", "1e3", "1_000", "+.5", "\t37.5\n", "inf", "-inf",
+            "nan", "Infinity", "٣٧", "\u200937", 12, -300.5, 1e308]
+    bad = ["", "abc", "1e", "--5", "1__0", "5c", "°", "37 5", "e", "in", None, [1], "٣x"]
+
+    for batch in range(batches):
+        # from all good values to all bad ones, so both ways of converting a
+        # chunk and both ways of picking out the errors are used
+        bad_share = rng.random() ** 2
+        size = rng.randint(0, 3 * CHUNK_SIZE)
+        values = [rng.choice(bad) if rng.random() < bad_share
+                  else rng.choice(good) if rng.random() < 0.5
+                  else str(round(rng.uniform(-500, 500), rng.randint(0, 3)))
+                  for count in range(size)]
+        min_temp = rng.choice([-273, -459])
+
+        numbers, valid, errors = parse_values(values, min_temp)
+        messages = error_messages(min_temp)
+        assert len(numbers) == len(valid) == size, batch
+
+        expected_errors = []
+        for index, value in enumerate(values):
+            number, error = cr.validate_temp(value, min_temp)
+            if number is None:
+                assert math.isnan(numbers[index]), (batch, index, value)
+            else:
+                assert numbers[index] == number or math.isnan(number), (batch, index, value)
+            assert valid[index] == (error == ""), (batch, index, value)
+            if error != "":
+                expected_errors.append((index, error))
+
+        assert [(index, messages[kind]) for index, kind in errors] == expected_errors, batch
+
+    assert parse_text(b"1\nabc\n-500", -273)[2] == [(1, NOT_A_NUMBER), (2, TOO_COLD)]
+    print(f"bulk_parse matches cr.validate_temp on {batches} random batches")
+
+
+# Main routine / Testing starts here
+if __name__ == "__main__":
+    verify()
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+
+# Cache of answers for repeated conversions (e.g. the same set-points being
+# converted over and over in the GUI). Only used for single conversions - the
+# batch functions in conversion_rounding are quicker than a cache lookup per value.
+
+# most conversions kept (least recently used ones are dropped first)
+CACHE_SIZE = 1024
+
+
+def make_key(value, direction):
+    """
+    Cache key for a conversion. -0.0 == 0.0 but they are shown differently
+    ("-0.0°C is 32°F"), so zeros keep their sign in the key.
+    """
+
+    if value == 0:
+        return repr(value), direction
+    return value, direction
+
+
+class ConversionCache:
+    """
+    Least recently used cache of (answer, answer statement) for each
+    (value, direction), with hit / miss / eviction counters
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        """
+        :param maxsize: Most conversions kept
+        """
+
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, value, direction):
+        """
+        Looks up a conversion
+        :param value: Temperature to be converted
+        :param direction: c.TO_CELSIUS or c.TO_FAHRENHEIT
+        :return: (answer, answer statement), or None if it isn't cached
+        """
+
+        key = make_key(value, direction)
+        cached = self.entries.get(key)
+
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return cached
+
+    def put(self, value, direction, answer, answer_statement):
+        """
+        Adds a conversion, dropping the least recently used one if the cache is full
+        """
+
+        self.entries[make_key(value, direction)] = (answer, answer_statement)
+
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        :return: Dictionary of the cache counters (and how full it is)
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.entries), "maxsize": self.maxsize}
+
+    def invalidate(self):
+        """
+        Empties the cache but keeps the counters (e.g. when the rounding changes
+        and the cached answers are out of date)
+        """
+        self.entries.clear()
+
+    def clear(self):
+        """
+        Empties the cache and resets the counters
+        """
+
+        self.invalidate()
+        self.hits = self.misses = self.evictions = 0
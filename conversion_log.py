@@ -0,0 +1,104 @@
+import logging
+import os
+import time
+
+# Logging / instrumentation for the temperature converter. Nothing is logged
+# unless it is switched on (e.g. TEMP_CONVERTER_LOG=DEBUG), and once it is on
+# messages are rate limited so a busy session can't flood the console.
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+
+# environment variable holding the log level (DEBUG, INFO, WARNING...)
+LOG_LEVEL_VARIABLE = "TEMP_CONVERTER_LOG"
+
+# most messages let through per second once logging is on
+DEFAULT_RATE = 20
+
+logger = logging.getLogger("temp_converter")
+logger.addHandler(logging.NullHandler())
+logger.setLevel(WARNING)
+
+
+class RateLimiter:
+    """
+    Lets at most `rate` messages per second through. Dropped messages are
+    counted and the count is added to the next message that gets through.
+    The check happens before a message is built, so dropped messages are cheap.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.rate = rate
+        self.allowance = rate
+        self.last_check = time.monotonic()
+        self.suppressed = 0
+
+    def allow(self):
+        """
+        :return: True if a message can be logged now
+        """
+
+        now = time.monotonic()
+        self.allowance = min(self.rate, self.allowance + (now - self.last_check) * self.rate)
+        self.last_check = now
+
+        if self.allowance < 1:
+            self.suppressed += 1
+            return False
+
+        self.allowance -= 1
+        return True
+
+
+limiter = RateLimiter()
+
+
+def setup_logging(level=None, rate=DEFAULT_RATE, stream=None):
+    """
+    Switches logging on
+    :param level: Log level name or number (default: from TEMP_CONVERTER_LOG, off if unset)
+    :param rate: Most messages shown per second
+    :param stream: Where to write messages (default: stderr)
+    """
+
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_VARIABLE)
+        if not level:
+            return
+
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+
+    limiter.rate = limiter.allowance = rate
+
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+
+    logger.addHandler(handler)
+    logger.setLevel(level)
+
+
+def enabled(level=DEBUG):
+    """
+    Checks if messages at this level are being logged - use it to skip
+    building log messages in busy code when logging is off
+    """
+    return logger.isEnabledFor(level)
+
+
+def log_event(event, level=DEBUG, **fields):
+    """
+    Logs an event as "event key=value ..." (does nothing if the level is off)
+    :param event: Name of the event, e.g. "convert"
+    :param level: Log level
+    :param fields: Details to include
+    """
+
+    if logger.isEnabledFor(level) and limiter.allow():
+        details = " ".join(f"{key}={value!r}" for key, value in fields.items())
+        if limiter.suppressed:
+            details += f" ({limiter.suppressed} messages suppressed)"
+            limiter.suppressed = 0
+
+        logger.log(level, "%s %s", event, details)
@@ -1,12 +1,171 @@
-def round_ans(val):
+from array import array
+
+# NumPy is optional - the batch functions fall back to plain Python without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# error messages from validate_temp (not a number | below absolute zero)
+NOT_A_NUMBER = "Please enter a number"
+TOO_COLD = "Enter a number more than / equal to {}"
+
+
+# rounding modes (ties go up, e.g. 2.5 -> 3 and -2.5 -> -2 | ties go to the even
+# digit, e.g. 2.5 -> 2 and 3.5 -> 4 - "banker's rounding")
+HALF_UP = "half_up"
+HALF_EVEN = "half_even"
+ROUNDING_MODES = [HALF_UP, HALF_EVEN]
+
+# decimal places answers can be rounded to (whole degrees | 0.1° | 0.01°)
+PLACES = [0, 1, 2]
+
+
+def round_num(val):
     """
-    Rounds temperatures to nearest degree
+    Rounds temperatures to nearest degree (numeric, no formatting)
     :param val: Number to be rounded
     :return: Number rounded to nearest degree
     """
 
-    var_rounded = (val * 2 + 1) // 2
-    return "{:.0f}".format(var_rounded)
+    return (val * 2 + 1) // 2
+
+
+def rounding_constants(places=0, mode=HALF_UP, scale=1, offset=0):
+    """
+    The numbers the rounding functions work with, for rounding value * scale +
+    offset (scale 1, offset 0 rounds the value itself). They are worked out
+    before being turned into floats, so conversions and rounding are one
+    multiply and one add (with rounding) and a divide:
+    half up - (value * scale + offset) // 2 / step, with the scale and offset
+    doubled and 1 added, like round_num
+    half even - round(value * scale + offset) / step
+    Ties are decided on the scaled float, not on the decimal that was typed.
+    Most decimals can't be stored exactly, so a typed tie can go either way,
+    e.g. round_ans(1.005, 2) gives 1.00 because 1.005 is stored as
+    1.00499999... (exact mode in conversion_units rounds the typed decimal).
+    :param places: Decimal places to round to (0, 1 or 2)
+    :param mode: HALF_UP or HALF_EVEN
+    :param scale: Exact (int / Fraction) or float multiplier
+    :param offset: Exact (int / Fraction) or float offset
+    :return: (scale, offset, step) as floats / an int
+    """
+
+    if places not in PLACES or mode not in ROUNDING_MODES:
+        raise ValueError(f"Can't round to {places!r} places with {mode!r} - "
+                         f"places must be one of {PLACES}, mode one of {ROUNDING_MODES}")
+
+    step = 10 ** places
+    if mode == HALF_UP:
+        return float(scale * 2 * step), float(offset * 2 * step + 1), step
+    return float(scale * step), float(offset * step), step
+
+
+def make_rounder(places=0, mode=HALF_UP, scale=1, offset=0):
+    """
+    Function that works out value * scale + offset and rounds it (see
+    rounding_constants) - used for rounding on its own and by the unit
+    conversions, so both always round the same way
+    :return: Function that rounds one number
+    """
+
+    scale, offset, step = rounding_constants(places, mode, scale, offset)
+
+    if mode == HALF_UP:
+        def round_func(val, scale=scale, offset=offset, step=step):
+            return (val * scale + offset) // 2 / step
+
+    else:
+        # round() with no places gives a whole number, which is quicker than
+        # round(x, 0), but it raises for infinity / not a number - those are
+        # given back as they are
+        def round_func(val, scale=scale, offset=offset, step=step):
+            val = val * scale + offset
+            try:
+                return round(val) / step
+            except (OverflowError, ValueError):
+                return val
+
+    return round_func
+
+
+# rounding function for each mode and number of decimal places
+ROUNDERS = {(places, mode): make_rounder(places, mode)
+            for places in PLACES for mode in ROUNDING_MODES}
+ROUNDERS[(0, HALF_UP)] = round_num
+
+
+def rounder(places=0, mode=HALF_UP):
+    """
+    The rounding function for a precision and rounding mode
+    :param places: Decimal places to round to (0, 1 or 2)
+    :param mode: HALF_UP or HALF_EVEN
+    :return: Function that rounds one number
+    """
+
+    if (places, mode) not in ROUNDERS:
+        # raises ValueError with the allowed places and modes
+        rounding_constants(places, mode)
+
+    return ROUNDERS[(places, mode)]
+
+
+def format_ans(val, places=0):
+    """
+    Formats a rounded temperature for display / export
+    :param val: Rounded number (from round_num or one of the *_num functions)
+    :param places: Decimal places to show
+    :return: Number as a string with `places` decimal places
+    """
+
+    if places == 0:
+        return "{:.0f}".format(val)
+    return "{:.{}f}".format(val, places)
+
+
+def format_result(val):
+    """
+    Formats an answer from the history, when the precision it was rounded to
+    isn't known - whole degrees have no decimal places, the rest have up to 2
+    """
+
+    if val % 1 == 0:
+        return "{:.0f}".format(val)
+    return "{:.2f}".format(val).rstrip("0")
+
+
+def round_ans(val, places=0, mode=HALF_UP):
+    """
+    Rounds temperatures to nearest degree (or 0.1 / 0.01 of a degree)
+    :param val: Number to be rounded
+    :param places: Decimal places to round to (0, 1 or 2)
+    :param mode: HALF_UP or HALF_EVEN
+    :return: Rounded number as a string
+    """
+
+    if places == 0 and mode == HALF_UP:
+        return format_ans(round_num(val))
+    return format_ans(rounder(places, mode)(val), places)
+
+
+def to_celsius_num(to_convert):
+    """
+    Converts from F to C (numeric, no formatting)
+    :param: to_convert: Temperature to be converted in F
+    :return: Converted temperature in C, rounded to nearest degree
+    """
+
+    return ((to_convert - 32) * 5 / 9 * 2 + 1) // 2
+
+
+def to_fahrenheit_num(to_convert):
+    """
+    Converts from C to F (numeric, no formatting)
+    :param to_convert: Temperature to be converted in C
+    :return: Converted temperature in F, rounded to nearest degree
+    """
+
+    return ((to_convert * 1.8 + 32) * 2 + 1) // 2
 
 
 def to_celsius(to_convert):
@@ -16,8 +175,7 @@ def to_celsius(to_convert):
     :return: Converted temperature in C
     """
 
-    answer = (to_convert - 32) * 5 / 9
-    return round_ans(answer)
+    return format_ans(to_celsius_num(to_convert))
 
 
 def to_fahrenheit(to_convert):
@@ -27,20 +185,101 @@ def to_fahrenheit(to_convert):
     :return: Converted temperature in F
     """
 
-    answer = to_convert * 1.8 + 32
-    return round_ans(answer)
+    return format_ans(to_fahrenheit_num(to_convert))
 
 
-# Main routine / Testing starts here
-to_c_test = [0, 100, -459]
-to_f_test = [0, 100, 40, -273]
+def validate_temp(to_convert, min_temp):
+    """
+    Checks a temperature is a number that is not below absolute zero
+    (the checks used by Converter.check_temp and the bulk converter)
+    :param to_convert: Temperature to be checked (usually text)
+    :param min_temp: Lowest allowed temperature (absolute zero for the input scale)
+    :return: (temperature as a float, error message) - the error is "" if it is valid
+    """
+
+    try:
+        to_convert = float(to_convert)
+    except (ValueError, TypeError):
+        return None, NOT_A_NUMBER
+
+    if to_convert >= min_temp:
+        return to_convert, ""
+
+    return to_convert, TOO_COLD.format(min_temp)
+
+
+def round_batch(values, places=0, mode=HALF_UP, scale=1, offset=0):
+    """
+    Rounds a batch of temperatures (same rules as round_ans, but without
+    formatting), or converts and rounds them (see rounding_constants)
+    :param values: Sequence, array.array or NumPy array of numbers
+    :param places: Decimal places to round to (0, 1 or 2)
+    :param mode: HALF_UP or HALF_EVEN
+    :param scale: Multiplier (the same as for make_rounder)
+    :param offset: Offset (the same as for make_rounder)
+    :return: Rounded numbers (NumPy array if NumPy is installed, otherwise array.array)
+    """
+
+    if np is None:
+        return array("d", map(make_rounder(places, mode, scale, offset), values))
 
-for item in to_f_test:
-    ans = to_fahrenheit(item)
-    print(f"{item} C is {ans} F")
+    scale, offset, step = rounding_constants(places, mode, scale, offset)
+    values = np.asarray(values, dtype=np.float64)
+    if mode == HALF_UP:
+        return (values * scale + offset) // 2 / step
 
-print()
+    # np.round rounds ties to the even number, like round()
+    return np.round(values * scale + offset) / step
 
-for item in to_c_test:
-    ans = to_celsius(item)
-    print(f"{item} C is {ans} F")
+
+def to_celsius_batch(to_convert):
+    """
+    Converts a batch of temperatures from F to C in one pass
+    :param to_convert: Sequence, array.array or NumPy array of temperatures in F
+    :return: Converted temperatures in C, rounded to the nearest degree
+    """
+
+    if np is not None:
+        to_convert = np.asarray(to_convert, dtype=np.float64)
+        return ((to_convert - 32) * 5 / 9 * 2 + 1) // 2
+
+    return array("d", [((item - 32) * 5 / 9 * 2 + 1) // 2 for item in to_convert])
+
+
+def to_fahrenheit_batch(to_convert):
+    """
+    Converts a batch of temperatures from C to F in one pass
+    :param to_convert: Sequence, array.array or NumPy array of temperatures in C
+    :return: Converted temperatures in F, rounded to the nearest degree
+    """
+
+    if np is not None:
+        to_convert = np.asarray(to_convert, dtype=np.float64)
+        return ((to_convert * 1.8 + 32) * 2 + 1) // 2
+
+    return array("d", [((item * 1.8 + 32) * 2 + 1) // 2 for item in to_convert])
+
+
+def verify():
+    """
+    Self-test - prints some known conversions so they can be checked by eye.
+    Only runs when asked for (python conversion_rounding.py), not on import.
+    """
+
+    to_c_test = [0, 100, -459]
+    to_f_test = [0, 100, 40, -273]
+
+    for item in to_f_test:
+        ans = to_fahrenheit(item)
+        print(f"{item} C is {ans} F")
+
+    print()
+
+    for item in to_c_test:
+        ans = to_celsius(item)
+        print(f"{item} F is {ans} C")
+
+
+# Main routine / Testing starts here
+if __name__ == "__main__":
+    verify()
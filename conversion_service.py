@@ -0,0 +1,365 @@
+import argparse
+import asyncio
+import json
+import math
+import sys
+from itertools import compress
+import bulk_convert as bc
+import bulk_parse as bp
+import conversion_log as cl
+import conversion_rounding as cr
+
+# Conversion service - lets other programs on this computer use the converter
+# without starting the GUI. Requests and responses are JSON, one per line:
+#
+#   {"id": 1, "to": "celsius", "value": 100}
+#       -> {"id": 1, "result": 38.0}
+#   {"id": 2, "to": "fahrenheit", "values": [0, "abc", -300]}
+#       -> {"id": 2, "results": [32.0, null, null],
+#           "errors": [{"index": 1, "error": "Please enter a number"},
+#                      {"index": 2, "error": "Enter a number more than / equal to -273"}]}
+#
+# Requests can be sent without waiting for the answers (pipelining) and the
+# answers come back in the same order. If a client stops reading its answers,
+# the service stops reading its requests until it catches up (back-pressure).
+# Single value requests can be grouped into micro-batches (see MicroBatcher).
+# Run with: python conversion_service.py [--port 8765] [--unix /tmp/converter.sock]
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+# longest request line (bytes) and most values in one batch request
+MAX_LINE = 1024 * 1024
+MAX_BATCH = 100000
+
+# most requests read from one client but not answered yet, and most values in
+# those answers (a batch answer counts as all of its values)
+MAX_PENDING = 256
+MAX_PENDING_VALUES = MAX_BATCH
+
+# error for answers JSON can't hold (infinity / not a number, e.g. "inf" typed in)
+NOT_FINITE = "Please enter a smaller number"
+
+# default micro-batch limits for single value requests (values, seconds)
+BATCH_SIZE = 64
+BATCH_WAIT = 0.002
+
+
+def convert_values(direction, values):
+    """
+    Checks and converts a batch of values (same checks as Converter.check_temp)
+    :param direction: "celsius" or "fahrenheit" (the scale to convert to)
+    :param values: List of numbers / strings
+    :return: (results with None for bad values, list of (index, error message))
+    """
+
+    min_temp, batch_func = bc.DIRECTIONS[direction]
+
+    numbers, valid, errors = bp.parse_values(values, min_temp)
+    answers = batch_func(bp.valid_numbers(numbers, valid))
+
+    # the total isn't finite if any answer is infinity / not a number
+    finite = math.isfinite(sum(answers))
+    if not errors and finite:
+        return list(answers), []
+
+    messages = bp.error_messages(min_temp)
+    errors = [(index, messages[kind]) for index, kind in errors]
+
+    results = [None] * len(values)
+    for index, answer in zip(compress(range(len(values)), valid), answers):
+        if finite or math.isfinite(answer):
+            results[index] = answer
+        else:
+            errors.append((index, NOT_FINITE))
+
+    if not finite:
+        errors.sort()
+    return results, errors
+
+
+def handle_request(request):
+    """
+    Works out the response to one request
+    :param request: Decoded JSON request
+    :return: Response dictionary
+    """
+
+    if not isinstance(request, dict):
+        return {"error": "Bad request: expected a JSON object"}
+
+    response = {"id": request.get("id")}
+
+    direction = request.get("to")
+    if direction not in bc.DIRECTIONS:
+        response["error"] = f"Bad request: 'to' must be one of {sorted(bc.DIRECTIONS)}"
+        return response
+
+    if "values" in request:
+        values = request["values"]
+        if not isinstance(values, list) or len(values) > MAX_BATCH:
+            response["error"] = f"Bad request: 'values' must be a list of up to {MAX_BATCH}"
+            return response
+
+        results, errors = convert_values(direction, values)
+        response["results"] = results
+        response["errors"] = [{"index": index, "error": error} for index, error in errors]
+        return response
+
+    if "value" in request:
+        results, errors = convert_values(direction, [request["value"]])
+        if errors:
+            response["error"] = errors[0][1]
+        else:
+            response["result"] = results[0]
+        return response
+
+    response["error"] = "Bad request: expected 'value' or 'values'"
+    return response
+
+
+class MicroBatcher:
+    """
+    Groups single value requests into batches. A batch is converted with one
+    call to the batch conversion function as soon as it holds `max_batch`
+    values, or `max_wait` seconds after its first value arrived, whichever
+    comes first. Each caller gets its own answer back.
+    """
+
+    def __init__(self, max_batch=BATCH_SIZE, max_wait=BATCH_WAIT):
+        """
+        :param max_batch: Most values in a batch
+        :param max_wait: Longest time (seconds) a value waits for its batch to fill up
+        """
+
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        # values waiting to be converted (value | future for the answer), per direction
+        self.pending = {direction: [] for direction in bc.DIRECTIONS}
+        self.timers = {}
+
+        self.batches = 0
+        self.values = 0
+
+    def submit(self, direction, to_convert):
+        """
+        Adds a checked value to the next batch
+        :param direction: "celsius" or "fahrenheit" (the scale to convert to)
+        :param to_convert: Temperature that has passed cr.validate_temp
+        :return: asyncio Future for the answer
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self.pending[direction]
+        batch.append((to_convert, future))
+
+        if len(batch) >= self.max_batch:
+            self.flush(direction)
+        elif direction not in self.timers:
+            self.timers[direction] = loop.call_later(self.max_wait, self.flush, direction)
+
+        return future
+
+    def flush(self, direction):
+        """
+        Converts the waiting values for one direction and hands out the answers
+        """
+
+        timer = self.timers.pop(direction, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self.pending[direction]
+        if not batch:
+            return
+        self.pending[direction] = []
+
+        answers = bc.DIRECTIONS[direction][1]([item[0] for item in batch])
+        for item, answer in zip(batch, answers):
+            if not item[1].done():
+                item[1].set_result(answer)
+
+        self.batches += 1
+        self.values += len(batch)
+
+
+def answer_size(answer):
+    """
+    Number of values in a response from respond (counted against MAX_PENDING_VALUES)
+    """
+
+    if isinstance(answer, dict) and "results" in answer:
+        return max(1, len(answer["results"]))
+    return 1
+
+
+def respond(line, batcher=None):
+    """
+    Decodes one request line and works out its response. Single value requests
+    go to the micro-batcher (if there is one) - for those the response is
+    returned as (request id, future for the answer).
+    """
+
+    try:
+        request = json.loads(line)
+    except ValueError as error:
+        return {"error": f"Bad request: {error}"}
+
+    if (batcher is not None and isinstance(request, dict) and "values" not in request
+            and "value" in request and request.get("to") in bc.DIRECTIONS):
+        direction = request["to"]
+        to_convert, error = cr.validate_temp(request["value"], bc.DIRECTIONS[direction][0])
+        if error != "":
+            return {"id": request.get("id"), "error": error}
+
+        return request.get("id"), batcher.submit(direction, to_convert)
+
+    return handle_request(request)
+
+
+async def serve_client(reader, writer, batcher=None):
+    """
+    Answers one client's requests, in order, until it disconnects. Requests are
+    read ahead of the answers being written (so pipelined requests can share
+    micro-batches) and a queue of up to MAX_PENDING answers (MAX_PENDING_VALUES
+    values) keeps the answers in order.
+    """
+
+    peer = writer.get_extra_info("peername")
+    cl.log_event("client connected", cl.INFO, peer=peer)
+
+    answers = asyncio.Queue(MAX_PENDING)
+
+    # values in the queued answers - no more requests are read (and converted)
+    # while there are MAX_PENDING_VALUES, so a few big batches can't fill up memory
+    pending_values = 0
+    room = asyncio.Event()
+    room.set()
+
+    async def read_requests():
+        nonlocal pending_values
+
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # line longer than MAX_LINE - the rest of the stream can't be trusted
+                await answers.put({"error": "Bad request: line too long"})
+                break
+            except ConnectionError:
+                break
+
+            if not line:
+                break
+            if line.strip():
+                # waits here if the queued answers are full (back-pressure)
+                await room.wait()
+                answer = respond(line, batcher)
+
+                pending_values += answer_size(answer)
+                if pending_values >= MAX_PENDING_VALUES:
+                    room.clear()
+                await answers.put(answer)
+
+        # no more requests - not reached if this is cancelled, when the answers
+        # have stopped being written and nothing would take it off a full queue
+        await answers.put(None)
+
+    async def write_answers():
+        nonlocal pending_values
+
+        while True:
+            answer = await answers.get()
+            if answer is None:
+                break
+
+            size = answer_size(answer)
+
+            # micro-batched request - wait for its batch
+            if isinstance(answer, tuple):
+                result = await answer[1]
+                if math.isfinite(result):
+                    answer = {"id": answer[0], "result": result}
+                else:
+                    answer = {"id": answer[0], "error": NOT_FINITE}
+
+            writer.write(json.dumps(answer).encode() + b"\n")
+
+            # waits here if the client isn't reading its answers (back-pressure)
+            await writer.drain()
+
+            pending_values -= size
+            if pending_values < MAX_PENDING_VALUES:
+                room.set()
+
+    reading = asyncio.ensure_future(read_requests())
+    try:
+        await write_answers()
+    except ConnectionError:
+        pass
+    finally:
+        reading.cancel()
+        writer.close()
+        cl.log_event("client disconnected", cl.INFO, peer=peer)
+
+
+async def start_server(host=HOST, port=PORT, unix_path=None, batcher=None):
+    """
+    Starts the service (TCP on host:port, or a Unix socket if unix_path is given)
+    :param batcher: Optional MicroBatcher for single value requests
+    :return: asyncio Server
+    """
+
+    async def serve(reader, writer):
+        await serve_client(reader, writer, batcher)
+
+    if unix_path is not None:
+        return await asyncio.start_unix_server(serve, unix_path, limit=MAX_LINE)
+
+    return await asyncio.start_server(serve, host, port, limit=MAX_LINE)
+
+
+async def run_server(host=HOST, port=PORT, unix_path=None, batch_size=BATCH_SIZE,
+                     batch_wait=BATCH_WAIT):
+    """
+    Runs the service until it is stopped (batch_size 0 switches micro-batching off)
+    """
+
+    batcher = MicroBatcher(batch_size, batch_wait) if batch_size > 0 else None
+    server = await start_server(host, port, unix_path, batcher)
+    where = unix_path if unix_path is not None else f"{host}:{port}"
+    print(f"Conversion service listening on {where}", file=sys.stderr)
+
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temperature conversion service")
+    parser.add_argument("--host", default=HOST, help=f"address to listen on (default: {HOST})")
+    parser.add_argument("--port", type=int, default=PORT,
+                        help=f"port to listen on (default: {PORT})")
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"most single values converted together (0 = no micro-batching, "
+                             f"default: {BATCH_SIZE})")
+    parser.add_argument("--batch-wait", type=float, default=BATCH_WAIT * 1000,
+                        help=f"longest wait for a micro-batch to fill up, in ms "
+                             f"(default: {BATCH_WAIT * 1000:g})")
+    args = parser.parse_args(argv)
+
+    cl.setup_logging()
+    try:
+        asyncio.run(run_server(args.host, args.port, args.unix, args.batch_size,
+                               args.batch_wait / 1000))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
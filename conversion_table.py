@@ -0,0 +1,125 @@
+from array import array
+import all_constants as c
+import conversion_rounding as cr
+
+# Lookup tables for whole degree conversions. Most readings are whole degrees
+# between absolute zero and a few thousand degrees, so their (rounded) answers
+# are worked out once and then looked up instead of being calculated again.
+# Values outside the table (or with a fraction) are calculated as normal.
+
+# highest whole degree in the tables (the lowest is absolute zero for the input scale)
+TABLE_HIGH = 5000
+
+# direction | lowest input (absolute zero) | conversion used to build the table
+TABLE_DETAILS = {
+    c.TO_CELSIUS: [c.ABS_ZERO_FAHRENHEIT, cr.to_celsius_num, cr.to_celsius_batch],
+    c.TO_FAHRENHEIT: [c.ABS_ZERO_CELSIUS, cr.to_fahrenheit_num, cr.to_fahrenheit_batch],
+}
+
+
+class ConversionTable:
+    """
+    Answers for every whole degree from absolute zero up to `high`, for each
+    direction. Each direction's table is built the first time it is used.
+
+    The answers are kept in an array (used for NumPy batches, where whole
+    arrays of indexes are looked up at once) and in a dictionary keyed by the
+    temperature (used for plain Python, where one dictionary lookup is quicker
+    than working out an array index and checking it is in range).
+    """
+
+    def __init__(self, high=TABLE_HIGH):
+        """
+        :param high: Highest whole degree in the tables
+        """
+
+        self.high = high
+        self.tables = {}
+        self.indexes = {}
+
+    def table(self, direction):
+        """
+        The answers for one direction (built on first use)
+        :param direction: c.TO_CELSIUS or c.TO_FAHRENHEIT
+        :return: array.array of answers - index 0 is absolute zero
+        """
+
+        answers = self.tables.get(direction)
+        if answers is None:
+            low, convert = TABLE_DETAILS[direction][:2]
+            answers = array("d", [convert(float(degree)) for degree in range(low, self.high + 1)])
+            self.tables[direction] = answers
+            self.indexes[direction] = {float(degree): answer
+                                       for degree, answer in enumerate(answers, start=low)}
+
+        return answers
+
+    def index(self, direction):
+        """
+        The answers for one direction as a dictionary of {temperature: answer}
+        """
+
+        answers = self.indexes.get(direction)
+        if answers is None:
+            self.table(direction)
+            answers = self.indexes[direction]
+
+        return answers
+
+    def convert(self, value, direction):
+        """
+        Converts one temperature (looked up if it is a whole degree in the table)
+        :param value: Temperature to be converted
+        :param direction: c.TO_CELSIUS or c.TO_FAHRENHEIT
+        :return: Converted temperature, rounded to nearest degree
+        """
+
+        answer = self.index(direction).get(value)
+        if answer is None:
+            answer = TABLE_DETAILS[direction][1](value)
+
+        return answer
+
+    def convert_batch(self, values, direction):
+        """
+        Converts a batch of temperatures (whole degrees in the table are looked up)
+        :param values: Sequence, array.array or NumPy array of temperatures
+        :param direction: c.TO_CELSIUS or c.TO_FAHRENHEIT
+        :return: Converted temperatures, rounded (NumPy array or array.array, like
+                 the conversion_rounding batch functions)
+        """
+
+        low, convert, convert_batch = TABLE_DETAILS[direction]
+
+        np = cr.np
+        if np is not None:
+            values = np.asarray(values, dtype=np.float64)
+            in_table = (values >= low) & (values <= self.high) & (values == np.floor(values))
+
+            result = np.empty(values.shape)
+            answers = np.frombuffer(self.table(direction))
+            result[in_table] = answers[values[in_table].astype(np.intp) - low]
+            result[~in_table] = convert_batch(values[~in_table])
+            return result
+
+        lookup = self.index(direction).get
+        return array("d", [answer if (answer := lookup(value)) is not None else convert(value)
+                           for value in values])
+
+
+# shared tables (each direction is built the first time it is used)
+default_table = ConversionTable()
+
+
+def to_celsius_batch(to_convert):
+    """
+    Converts a batch of temperatures from F to C, using the lookup table where it can
+    """
+    return default_table.convert_batch(to_convert, c.TO_CELSIUS)
+
+
+def to_fahrenheit_batch(to_convert):
+    """
+    Converts a batch of temperatures from C to F, using the lookup table where it can
+    """
+    return default_table.convert_batch(to_convert, c.TO_FAHRENHEIT)
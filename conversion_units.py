@@ -0,0 +1,312 @@
+import math
+from array import array
+from decimal import Decimal
+from fractions import Fraction
+import all_constants as c
+import conversion_rounding as cr
+
+# Conversions between any two temperature units in c.UNITS (Kelvin, Celsius,
+# Fahrenheit, Rankine and Réaumur). Each unit is defined once, relative to
+# Kelvin, so a conversion between two units is always one multiply and one add
+# (value * scale + offset). The scale and offset for each pair of units are
+# worked out exactly (with fractions) the first time the pair is used, and the
+# resulting plan is kept and reused for single values and batches.
+# Adding a unit only needs a new line in c.UNITS.
+
+# conversion plans already worked out, {(source, target): ConversionPlan}
+PLANS = {}
+
+# Exact mode - answers are rounded as if worked out with no rounding errors,
+# from the decimal number that was typed in (the shortest decimal that gives the
+# same float, so up to 15 significant digits). The float answer is used when it
+# is far enough from a tie (a half-way point between two rounded answers) that
+# the errors can't have changed which way it rounds. The answer before rounding
+# is value * scale + offset, and each float multiply / add (and turning the
+# typed decimal and the exact scale and offset into floats) is out by at most
+# half a unit in the last place - 2 ** -53 of the size. Four of those, from
+# numbers no bigger than |answer| + |offset|, is less than TIE_MARGIN of that.
+# Anything closer to a tie than that is worked out again exactly, with whole
+# numbers (the typed decimal, scale and offset as numerator / denominator pairs).
+TIE_MARGIN = 2 ** -48
+
+# throughput budget for exact mode - at most this many times slower than the
+# float conversion with the same precision and rounding mode, for typed values
+# (where only real ties and near-ties are worked out again). See bench_exact.py
+EXACT_BUDGET = 2.0
+HALF = Fraction(1, 2)
+
+
+class ConversionPlan:
+    """
+    Conversion from one unit to another, as value * scale + offset. Rounded
+    answers fold the half-up rounding of round_num into the same multiply and
+    add: ((value * scale + offset) * 2 + 1) // 2 is worked out as
+    (value * (2 * scale) + (2 * offset + 1)) // 2.
+    """
+
+    def __init__(self, source, target):
+        """
+        :param source: Unit to convert from (a key of c.UNITS)
+        :param target: Unit to convert to (a key of c.UNITS)
+        """
+
+        for unit in (source, target):
+            if unit not in c.UNITS:
+                raise ValueError(f"Unknown unit {unit!r} - expected one of {sorted(c.UNITS)}")
+
+        self.source = source
+        self.target = target
+
+        # source -> kelvin -> target, worked out exactly before being turned into floats
+        source_multiplier, source_offset = c.UNITS[source][1:]
+        target_multiplier, target_offset = c.UNITS[target][1:]
+        scale = target_multiplier / source_multiplier
+        offset = target_offset - source_offset * scale
+
+        self.scale = float(scale)
+        self.offset = float(offset)
+        self.round_scale, self.round_offset, step = cr.rounding_constants(0, cr.HALF_UP,
+                                                                           scale, offset)
+
+        # exact scale and offset, and the rounded conversions made so far
+        # ({(places, mode): function})
+        self.exact = [scale, offset]
+        self.rounders = {(0, cr.HALF_UP): self.convert_num}
+        self.exact_rounders = {}
+
+    def __repr__(self):
+        return f"ConversionPlan({self.source!r} -> {self.target!r}: " \
+               f"x * {self.scale!r} + {self.offset!r})"
+
+    def convert(self, value):
+        """
+        Converts one temperature (not rounded)
+        """
+        return value * self.scale + self.offset
+
+    def convert_num(self, value):
+        """
+        Converts one temperature, rounded to the nearest degree (half-up)
+        """
+        return (value * self.round_scale + self.round_offset) // 2
+
+    def rounder(self, places=0, mode=cr.HALF_UP):
+        """
+        The conversion rounded to a precision with a rounding mode, as one
+        function (made the first time it is asked for). Like convert_num, the
+        rounding is folded into the conversion's multiply and add (see
+        cr.rounding_constants - cr.round_batch rounds batches the same way).
+        :param places: Decimal places to round to (0, 1 or 2)
+        :param mode: cr.HALF_UP or cr.HALF_EVEN
+        :return: Function that converts and rounds one temperature
+        """
+
+        convert = self.rounders.get((places, mode))
+        if convert is not None:
+            return convert
+
+        convert = cr.make_rounder(places, mode, *self.exact)
+        self.rounders[(places, mode)] = convert
+        return convert
+
+    def exact_rounder(self, places=0, mode=cr.HALF_UP):
+        """
+        Like rounder, but the answers are always correctly rounded (see
+        TIE_MARGIN) - the float answer is used unless it is close to a tie, when
+        the answer is worked out again exactly
+        :param places: Decimal places to round to (0, 1 or 2)
+        :param mode: cr.HALF_UP or cr.HALF_EVEN
+        :return: Function that converts and rounds one temperature
+        """
+
+        convert = self.exact_rounders.get((places, mode))
+        if convert is not None:
+            return convert
+
+        # checks places and mode
+        cr.rounder(places, mode)
+
+        scale, offset = self.exact
+        step = 10 ** places
+        scale = Fraction(scale * step)
+        offset = Fraction(offset * step)
+
+        # the answer for a typed value of value_top / value_bottom is
+        # (value_top * top_scale + value_bottom * top_offset) / (value_bottom * bottom)
+        top_scale = scale.numerator * offset.denominator
+        top_offset = offset.numerator * scale.denominator
+        bottom = scale.denominator * offset.denominator
+
+        if mode == cr.HALF_UP:
+            def exact_round(value):
+                value_top, value_bottom = Decimal(repr(value)).as_integer_ratio()
+                answer_bottom = value_bottom * bottom
+                return ((value_top * top_scale + value_bottom * top_offset) * 2
+                        + answer_bottom) // (answer_bottom * 2)
+
+        else:
+            def exact_round(value):
+                value_top, value_bottom = Decimal(repr(value)).as_integer_ratio()
+                answer_bottom = value_bottom * bottom
+                nearest, remainder = divmod(value_top * top_scale + value_bottom * top_offset,
+                                            answer_bottom)
+
+                # over half way, or exactly half way and the number below is odd
+                remainder *= 2
+                if remainder > answer_bottom or (remainder == answer_bottom and nearest % 2):
+                    nearest += 1
+                return nearest
+
+        def convert(value, scale=float(scale), offset=float(offset), step=step,
+                    margin=abs(float(offset)) * TIE_MARGIN, exact_round=exact_round):
+            answer = value * scale + offset
+
+            # infinity / not a number (e.g. "inf" or "1e308" typed in) can't be
+            # rounded, so they are given back as they are (like the float conversion)
+            if not math.isfinite(answer):
+                return answer
+
+            nearest = round(answer)
+
+            # answer - nearest is between -0.5 and 0.5, a tie is at either end
+            if 0.5 - abs(answer - nearest) <= abs(answer) * TIE_MARGIN + margin:
+                nearest = exact_round(value)
+
+            return nearest / step
+
+        self.exact_rounders[(places, mode)] = convert
+        return convert
+
+    def convert_batch(self, values, rounded=True):
+        """
+        Converts a batch of temperatures in one pass
+        :param values: Sequence, array.array or NumPy array of temperatures
+        :param rounded: Round the answers to the nearest degree (half-up)
+        :return: Converted temperatures (NumPy array if NumPy is installed,
+                 otherwise array.array)
+        """
+
+        if rounded:
+            scale, offset = self.round_scale, self.round_offset
+        else:
+            scale, offset = self.scale, self.offset
+
+        np = cr.np
+        if np is not None:
+            values = np.asarray(values, dtype=np.float64)
+            answers = values * scale + offset
+            return answers // 2 if rounded else answers
+
+        if rounded:
+            return array("d", [(value * scale + offset) // 2 for value in values])
+
+        return array("d", [value * scale + offset for value in values])
+
+
+def plan(source, target):
+    """
+    The conversion plan for a pair of units (worked out on first use, then reused)
+    :param source: Unit to convert from (a key of c.UNITS)
+    :param target: Unit to convert to (a key of c.UNITS)
+    :return: ConversionPlan
+    """
+
+    conversion = PLANS.get((source, target))
+    if conversion is None:
+        conversion = ConversionPlan(source, target)
+        PLANS[(source, target)] = conversion
+
+    return conversion
+
+
+def convert(value, source, target, places=0, mode=cr.HALF_UP, exact=False):
+    """
+    Converts one temperature between any two units
+    :param places: Decimal places to round to (0, 1 or 2)
+    :param mode: cr.HALF_UP or cr.HALF_EVEN
+    :param exact: Always round correctly (see TIE_MARGIN)
+    :return: Converted temperature, rounded
+    """
+
+    if exact:
+        return plan(source, target).exact_rounder(places, mode)(value)
+    return plan(source, target).rounder(places, mode)(value)
+
+
+def convert_batch(values, source, target, places=0, mode=cr.HALF_UP, exact=False):
+    """
+    Converts a batch of temperatures between any two units
+    :param places: Decimal places to round to (0, 1 or 2)
+    :param mode: cr.HALF_UP or cr.HALF_EVEN
+    :param exact: Always round correctly (see TIE_MARGIN)
+    :return: Converted temperatures, rounded
+    """
+
+    conversion = plan(source, target)
+    if exact:
+        return array("d", map(conversion.exact_rounder(places, mode), values))
+
+    if places == 0 and mode == cr.HALF_UP:
+        return conversion.convert_batch(values)
+
+    if cr.np is not None:
+        return cr.round_batch(values, places, mode, *conversion.exact)
+
+    return array("d", map(conversion.rounder(places, mode), values))
+
+
+def verify():
+    """
+    Self-test - checks absolute zero is 0 K in every unit, that conversions
+    there and back again give the starting temperature, and prints the plans.
+    Only runs when asked for (python conversion_units.py), not on import.
+    """
+
+    test_values = [-40, 0, 37, 100, 1000.5]
+
+    for source in c.UNITS:
+        assert abs(plan(source, "kelvin").convert(c.ABS_ZERO[source])) < 1e-9, source
+
+        for target in c.UNITS:
+            conversion = plan(source, target)
+            back = plan(target, source)
+            for value in test_values:
+                assert abs(back.convert(conversion.convert(value)) - value) < 1e-9, \
+                    (source, target, value)
+
+            print(conversion)
+
+    # exact mode matches the answers worked out with fractions, ties included
+    for source, target in [("celsius", "fahrenheit"), ("fahrenheit", "celsius"),
+                           ("celsius", "reaumur")]:
+        scale, offset = plan(source, target).exact
+        for places in cr.PLACES:
+            step = 10 ** places
+            for value in [-40, 0.25, 0.125, 0.0625, 36.65, 521.055, 97.7, 1000.5]:
+                answer = Fraction(repr(value)) * scale * step + offset * step
+                assert convert(value, source, target, places, cr.HALF_UP, exact=True) \
+                    == math.floor(answer + HALF) / step, (source, target, places, value)
+                assert convert(value, source, target, places, cr.HALF_EVEN, exact=True) \
+                    == round(answer) / step, (source, target, places, value)
+
+            # infinity, not a number and answers too big for a float don't raise
+            for value in [math.inf, -math.inf, 1e308]:
+                assert not math.isnan(convert(value, source, target, places, exact=True)), \
+                    (source, target, places, value)
+            assert math.isnan(convert(math.nan, source, target, places, exact=True))
+
+    print()
+    for unit, details in c.UNITS.items():
+        print(f"absolute zero: {c.ABS_ZERO[unit]:g}{details[0]} "
+              f"(lowest whole degree {c.MIN_TEMP[unit]})")
+
+    print()
+    for value in [0, 100, -40]:
+        print(f"{value}°C is " + ", ".join(
+            f"{cr.format_ans(convert(value, 'celsius', target))}{details[0]}"
+            for target, details in c.UNITS.items() if target != "celsius"))
+
+
+# Main routine / Testing starts here
+if __name__ == "__main__":
+    verify()
@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import tempfile
+from datetime import date, datetime
+import all_constants as c
+import conversion_rounding as cr
+import history_store as hs
+
+# History export - streams calculations to a file in large buffered chunks.
+# Files are written to a temporary file first and then renamed, so a failed
+# export never leaves a half written file behind.
+
+# calculations formatted and written at a time
+CHUNK_SIZE = 10000
+
+# write buffer for the export file
+BUFFER_SIZE = 1024 * 1024
+
+# scale letters for each direction (converted from | converted to)
+UNITS = {
+    c.TO_CELSIUS: ["F", "C"],
+    c.TO_FAHRENHEIT: ["C", "F"],
+}
+
+
+def text_header(generated):
+    """
+    Heading for plain text exports (same as the original export)
+    """
+
+    return ("***** Temperature Calculations ***** \n"
+            f"Generated: {generated.strftime('%d/%m/%Y')}\n\n"
+            "Here is your calculation history (oldest to newest) \n")
+
+
+def text_line(item):
+    """
+    Plain text line for a calculation, e.g. "10.0°C is 50°F"
+    """
+    return hs.make_statement(item.value, item.direction, item.result) + "\n"
+
+
+def csv_line(item):
+    """
+    CSV line for a calculation (value | from scale | answer | to scale | time)
+    """
+    from_unit, to_unit = UNITS[item.direction]
+    return (f"{item.value!r},{from_unit},{cr.format_result(item.result)},{to_unit},"
+            f"{datetime.fromtimestamp(item.timestamp).isoformat()}\n")
+
+
+def jsonl_line(item):
+    """
+    JSON Lines line for a calculation
+    """
+    from_unit, to_unit = UNITS[item.direction]
+
+    # repr of a finite float is valid JSON and much quicker than json.dumps
+    if not math.isfinite(item.value):
+        return json.dumps({"value": item.value, "from": from_unit, "result": item.result,
+                           "to": to_unit, "timestamp": item.timestamp}) + "\n"
+
+    return (f'{{"value": {item.value!r}, "from": "{from_unit}", "result": {item.result!r}, '
+            f'"to": "{to_unit}", "timestamp": {item.timestamp!r}}}\n')
+
+
+# format | file extension | header (given the export date) | line for each calculation
+FORMATS = {
+    "Text": ["txt", text_header, text_line],
+    "CSV": ["csv", lambda generated: "value,from,result,to,time\n", csv_line],
+    "JSON Lines": ["jsonl", lambda generated: "", jsonl_line],
+}
+
+
+def export_file_name(export_format="Text", folder=".", today=None):
+    """
+    Picks a file name for today's export that doesn't overwrite an earlier one
+    :param export_format: One of FORMATS
+    :param folder: Folder the file will go in
+    :param today: Date of the export (default: today)
+    :return: File name, e.g. temperatures_2024_05_01.txt (or ..._2.txt if that exists)
+    """
+
+    if today is None:
+        today = date.today()
+
+    extension = FORMATS[export_format][0]
+    base_name = f"temperatures_{today.strftime('%Y_%m_%d')}"
+
+    file_name = f"{base_name}.{extension}"
+    count = 1
+    while os.path.exists(os.path.join(folder, file_name)):
+        count += 1
+        file_name = f"{base_name}_{count}.{extension}"
+
+    return os.path.join(folder, file_name)
+
+
+def export_history(records, file_name, export_format="Text", progress=None,
+                   chunk_size=CHUNK_SIZE, generated=None):
+    """
+    Writes calculations to a file (atomically - through a temporary file and a rename)
+    :param records: Iterable of Calculation, oldest first (e.g. HistoryStore.iter_records())
+    :param file_name: File to write
+    :param export_format: One of FORMATS
+    :param progress: Optional function called with the number written after each chunk
+    :param chunk_size: Calculations formatted and written at a time
+    :param generated: Date shown in the text heading (default: today)
+    :return: Number of calculations written
+    """
+
+    if generated is None:
+        generated = date.today()
+
+    make_header, make_line = FORMATS[export_format][1:]
+    folder = os.path.dirname(os.path.abspath(file_name))
+
+    # mkstemp makes the file private - give it normal permissions
+    temp_handle, temp_name = tempfile.mkstemp(dir=folder, prefix=".export_", suffix=".tmp")
+    os.chmod(temp_name, 0o644)
+    written = 0
+    try:
+        with open(temp_handle, "w", encoding="utf-8", newline="",
+                  buffering=BUFFER_SIZE) as out_file:
+            out_file.write(make_header(generated))
+
+            chunk = []
+            for item in records:
+                chunk.append(make_line(item))
+                if len(chunk) >= chunk_size:
+                    out_file.write("".join(chunk))
+                    written += len(chunk)
+                    chunk = []
+                    if progress is not None:
+                        progress(written)
+
+            out_file.write("".join(chunk))
+            written += len(chunk)
+
+            out_file.flush()
+            os.fsync(out_file.fileno())
+
+        os.replace(temp_name, file_name)
+
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+    if progress is not None:
+        progress(written)
+
+    return written
@@ -0,0 +1,139 @@
+import os
+import struct
+import time
+import history_store as hs
+
+# Append-only history journal - every calculation is added to the end of a
+# binary file as a fixed size record, so the newest calculations can be read
+# back without reading the rest of the file.
+
+# start of every journal file (format name and version)
+MAGIC = b"TEMPJRN1"
+
+# value | answer | timestamp | direction (little-endian, 25 bytes)
+RECORD = struct.Struct("<dddb")
+
+# fsync after this many calculations, or this many seconds, whichever comes first
+SYNC_EVERY = 64
+SYNC_SECONDS = 1.0
+
+# records read at a time when reading the whole journal
+READ_BLOCK = 65536
+
+
+class HistoryJournal:
+    """
+    Append-only file of calculations. Writes are buffered and synced to disk in
+    batches (every SYNC_EVERY calculations / SYNC_SECONDS, and on close).
+    SYNC_SECONDS is only checked when a calculation is added, so a program that
+    can sit idle should also call sync() every SYNC_SECONDS (the GUI does).
+    """
+
+    def __init__(self, file_name, sync_every=SYNC_EVERY, sync_seconds=SYNC_SECONDS):
+        """
+        :param file_name: Journal file (created if it doesn't exist)
+        :param sync_every: Most calculations written between fsyncs
+        :param sync_seconds: Longest time between fsyncs (checked when adding)
+        """
+
+        self.file_name = file_name
+        self.sync_every = sync_every
+        self.sync_seconds = sync_seconds
+
+        self.out_file = open(file_name, "ab")
+        if self.out_file.tell() == 0:
+            self.out_file.write(MAGIC)
+            self.out_file.flush()
+        else:
+            with open(file_name, "rb") as in_file:
+                if in_file.read(len(MAGIC)) != MAGIC:
+                    self.out_file.close()
+                    raise ValueError(f"{file_name} is not a temperature history journal")
+
+        # a record cut short by a crash is trimmed off so new records line up
+        size = os.path.getsize(file_name)
+        self.count = (size - len(MAGIC)) // RECORD.size
+        whole_size = len(MAGIC) + self.count * RECORD.size
+        if size != whole_size:
+            self.out_file.truncate(whole_size)
+
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def append(self, value, direction, result, timestamp):
+        """
+        Adds a calculation to the end of the journal
+        """
+
+        self.out_file.write(RECORD.pack(value, result, timestamp, direction))
+        self.count += 1
+        self.pending += 1
+
+        if (self.pending >= self.sync_every
+                or time.monotonic() - self.last_sync >= self.sync_seconds):
+            self.sync()
+
+    def sync(self):
+        """
+        Writes buffered calculations and makes sure they are on disk
+        """
+
+        self.out_file.flush()
+        if self.pending:
+            os.fsync(self.out_file.fileno())
+            self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def tail(self, count):
+        """
+        The most recent calculations, oldest first (only these are read from disk)
+        :param count: Most calculations to read
+        :return: List of Calculation
+        """
+
+        count = min(count, self.count)
+        if count == 0:
+            return []
+
+        self.out_file.flush()
+        with open(self.file_name, "rb") as in_file:
+            in_file.seek(len(MAGIC) + (self.count - count) * RECORD.size)
+            data = in_file.read(count * RECORD.size)
+
+        return [hs.Calculation(value, direction, result, timestamp)
+                for value, result, timestamp, direction in RECORD.iter_unpack(data)]
+
+    def read_records(self, count=None):
+        """
+        Reads calculations from the start of the journal, oldest first
+        :param count: Number of calculations to read (default: all written so far)
+        :return: Generator of Calculation
+        """
+
+        if count is None:
+            count = self.count
+
+        self.out_file.flush()
+        return self._read(count)
+
+    def _read(self, count):
+        """
+        Generator behind read_records (opens its own file, so it can run on another thread)
+        """
+        with open(self.file_name, "rb") as in_file:
+            in_file.seek(len(MAGIC))
+            while count > 0:
+                block = min(count, READ_BLOCK)
+                data = in_file.read(block * RECORD.size)
+                for value, result, timestamp, direction in RECORD.iter_unpack(data):
+                    yield hs.Calculation(value, direction, result, timestamp)
+                count -= block
+
+    def close(self):
+        """
+        Syncs and closes the journal
+        """
+
+        if not self.out_file.closed:
+            self.sync()
+            self.out_file.close()
@@ -0,0 +1,197 @@
+import sqlite3
+import time
+import all_constants as c
+import conversion_log as cl
+import history_store as hs
+
+# SQLite history backend - an alternative to history_journal that keeps every
+# calculation in an indexed table, so the history can be searched (e.g. all
+# conversions of more than 100°F last week). It has the same methods as
+# HistoryJournal, so a HistoryStore can use either one.
+
+# calculations inserted in one transaction (or after BATCH_SECONDS)
+BATCH_SIZE = 256
+BATCH_SECONDS = 1.0
+
+# results returned per query page
+PAGE_SIZE = 100
+
+# records read at a time when reading the whole history
+READ_BLOCK = 10000
+
+# the temperature in °F for each calculation (the typed value for °F to °C,
+# the answer for °C to °F), so searches mean the same thing in both directions
+FAHRENHEIT = f"(CASE WHEN direction = {c.TO_CELSIUS} THEN value ELSE result END)"
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS calculations ("
+    "id INTEGER PRIMARY KEY, timestamp REAL NOT NULL, direction INTEGER NOT NULL, "
+    "value REAL NOT NULL, result REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS calculations_timestamp ON calculations (timestamp)",
+    # indexes on the typed value from older databases (searches use °F now)
+    "DROP INDEX IF EXISTS calculations_direction",
+    "DROP INDEX IF EXISTS calculations_value",
+    f"CREATE INDEX IF NOT EXISTS calculations_direction_fahrenheit "
+    f"ON calculations (direction, {FAHRENHEIT})",
+    f"CREATE INDEX IF NOT EXISTS calculations_fahrenheit ON calculations ({FAHRENHEIT})",
+]
+
+
+class SqliteHistory:
+    """
+    Calculation history in an SQLite database. New calculations are inserted
+    in batches (one transaction per batch), and pending ones are written
+    before every read. The database uses write-ahead logging, so a batch can
+    be inserted while another thread is reading (e.g. during an export).
+    """
+
+    def __init__(self, file_name, batch_size=BATCH_SIZE, batch_seconds=BATCH_SECONDS):
+        """
+        :param file_name: Database file (created if it doesn't exist)
+        :param batch_size: Most calculations waiting to be inserted
+        :param batch_seconds: Longest time a calculation waits (checked when adding)
+        """
+
+        self.file_name = file_name
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+
+        self.connection = sqlite3.connect(file_name)
+
+        # readers and the writer don't block each other in WAL mode (the
+        # default rollback journal locks the file for the whole of a read)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+        self.count = self.connection.execute("SELECT COUNT(*) FROM calculations").fetchone()[0]
+        self.pending = []
+        self.last_sync = time.monotonic()
+
+    def append(self, value, direction, result, timestamp):
+        """
+        Adds a calculation (inserted with the next batch)
+        """
+
+        self.pending.append((timestamp, direction, value, result))
+        self.count += 1
+
+        if (len(self.pending) >= self.batch_size
+                or time.monotonic() - self.last_sync >= self.batch_seconds):
+            self.sync()
+
+    def sync(self):
+        """
+        Inserts the waiting calculations in one transaction. If the database
+        can't be written to (e.g. it is locked or the disk is full) the
+        calculations are kept and tried again with the next batch, so the
+        converter keeps working.
+        """
+
+        if self.pending:
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT INTO calculations (timestamp, direction, value, result) "
+                        "VALUES (?, ?, ?, ?)", self.pending)
+            except sqlite3.Error as error:
+                cl.log_event("history sync failed", cl.WARNING, file=self.file_name,
+                             waiting=len(self.pending), error=str(error))
+            else:
+                self.pending = []
+        self.last_sync = time.monotonic()
+
+    def tail(self, count):
+        """
+        The most recent calculations, oldest first
+        :param count: Most calculations to read
+        :return: List of Calculation
+        """
+
+        self.sync()
+        rows = self.connection.execute(
+            "SELECT value, direction, result, timestamp FROM calculations "
+            "ORDER BY id DESC LIMIT ?", (count,)).fetchall()
+
+        return [hs.Calculation(*row) for row in reversed(rows)]
+
+    def read_records(self, count=None):
+        """
+        Reads calculations oldest first
+        :param count: Number of calculations to read (default: all added so far)
+        :return: Generator of Calculation
+        """
+
+        if count is None:
+            count = self.count
+
+        self.sync()
+        return self._read(count)
+
+    def _read(self, count):
+        """
+        Generator behind read_records (uses its own connection, so it can run on
+        another thread)
+        """
+
+        connection = sqlite3.connect(self.file_name)
+        try:
+            cursor = connection.execute(
+                "SELECT value, direction, result, timestamp FROM calculations "
+                "ORDER BY id LIMIT ?", (count,))
+            while True:
+                rows = cursor.fetchmany(READ_BLOCK)
+                if not rows:
+                    break
+                for row in rows:
+                    yield hs.Calculation(*row)
+        finally:
+            connection.close()
+
+    def query(self, direction=None, min_value=None, max_value=None, since=None,
+              until=None, before_id=None, limit=PAGE_SIZE):
+        """
+        Finds calculations, newest first, one page at a time
+        :param direction: c.TO_CELSIUS / c.TO_FAHRENHEIT (None for both)
+        :param min_value: Lowest temperature in °F - the typed value or the answer,
+                          whichever is in °F (None for no limit)
+        :param max_value: Highest temperature in °F (None for no limit)
+        :param since: Earliest time (None for no limit)
+        :param until: Latest time (None for no limit)
+        :param before_id: Id of the last result from the previous page (None for page 1)
+        :param limit: Most results to return
+        :return: List of (id, Calculation)
+        """
+
+        self.sync()
+
+        # (condition, value) pairs for the filters that are set
+        filters = [
+            ["direction = ?", direction],
+            [f"{FAHRENHEIT} >= ?", min_value],
+            [f"{FAHRENHEIT} <= ?", max_value],
+            ["timestamp >= ?", since],
+            ["timestamp <= ?", until],
+            ["id < ?", before_id],
+        ]
+        conditions = [item[0] for item in filters if item[1] is not None]
+        parameters = [item[1] for item in filters if item[1] is not None]
+
+        sql = "SELECT id, value, direction, result, timestamp FROM calculations"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id DESC LIMIT ?"
+
+        rows = self.connection.execute(sql, parameters + [limit]).fetchall()
+        return [(row[0], hs.Calculation(*row[1:])) for row in rows]
+
+    def close(self):
+        """
+        Inserts any waiting calculations and closes the database
+        """
+
+        if self.connection is not None:
+            self.sync()
+            self.connection.close()
+            self.connection = None
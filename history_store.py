@@ -0,0 +1,248 @@
+import itertools
+import time
+from array import array
+from collections import namedtuple
+import all_constants as c
+import conversion_rounding as cr
+
+# one calculation from the history
+Calculation = namedtuple("Calculation", ["value", "direction", "result", "timestamp"])
+
+
+def make_statement(value, direction, result, places=None):
+    """
+    Formats a calculation for display / export
+    :param value: Temperature that was converted
+    :param direction: c.TO_CELSIUS or c.TO_FAHRENHEIT
+    :param result: Converted temperature (rounded)
+    :param places: Decimal places to show (None - whole degrees have none and
+                   anything else up to 2, e.g. for the history, where the
+                   precision each answer was rounded to isn't kept)
+    :return: Answer statement, e.g. "10.0°C is 50°F"
+    """
+
+    if places is None:
+        answer = cr.format_result(result)
+    else:
+        answer = cr.format_ans(result, places)
+
+    if direction == c.TO_FAHRENHEIT:
+        return f"{value}°C is {answer}°F"
+
+    return f"{value}°F is {answer}°C"
+
+
+class HistoryStore:
+    """
+    Calculation history kept in compact columns (one typed array per field).
+    Once it holds `capacity` calculations the oldest one is overwritten (ring
+    buffer). If a spill file is given, overwritten calculations are appended to
+    it first so they can still be exported. If a journal is given, every
+    calculation is also saved to it, and the newest `reload` calculations from
+    earlier sessions are loaded back in.
+    """
+
+    def __init__(self, capacity=c.HISTORY_CAP, spill_file=None, journal=None, reload=0):
+        """
+        :param capacity: Most calculations kept in memory
+        :param spill_file: Optional file name to save overwritten calculations to
+        :param journal: Optional HistoryJournal to save every calculation to
+        :param reload: Number of earlier calculations to load back from the journal
+        """
+
+        self.capacity = capacity
+        self.spill_file = spill_file
+
+        self.values = array("d")
+        self.directions = array("b")
+        self.results = array("d")
+        self.timestamps = array("d")
+
+        # index of the oldest calculation (moves once the buffer is full)
+        self.start = 0
+
+        # calculations no longer held in memory (spilled or dropped)
+        self.evicted = 0
+        self.spill_out = None
+
+        # functions called with each new calculation (e.g. an open history box)
+        self.listeners = []
+
+        # calculations from earlier sessions that are only in the journal
+        self.journal = journal
+        self.earlier = 0
+        if journal is not None:
+            earlier_records = journal.tail(min(reload, capacity))
+            for item in earlier_records:
+                self.store(*item)
+            self.earlier = journal.count - len(earlier_records)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def total(self):
+        """
+        Number of calculations made, including ones no longer held in memory
+        """
+        return self.earlier + self.evicted + len(self.values)
+
+    def append(self, value, direction, result, timestamp=None):
+        """
+        Adds a calculation to the history
+        :param value: Temperature that was converted
+        :param direction: c.TO_CELSIUS or c.TO_FAHRENHEIT
+        :param result: Converted temperature (rounded)
+        :param timestamp: Time of the calculation (default: now)
+        """
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        self.store(value, direction, result, timestamp)
+        if self.journal is not None:
+            self.journal.append(value, direction, result, timestamp)
+
+        if self.listeners:
+            item = Calculation(value, direction, result, timestamp)
+            for listener in self.listeners:
+                listener(item)
+
+    def store(self, value, direction, result, timestamp):
+        """
+        Puts a calculation into the columns (overwriting the oldest if full)
+        """
+
+        if len(self.values) < self.capacity:
+            self.values.append(value)
+            self.directions.append(direction)
+            self.results.append(result)
+            self.timestamps.append(timestamp)
+
+        else:
+            # buffer is full - overwrite the oldest calculation
+            index = self.start
+            if self.spill_file is not None:
+                self.spill(self.record_at(index))
+
+            self.values[index] = value
+            self.directions[index] = direction
+            self.results[index] = result
+            self.timestamps[index] = timestamp
+
+            self.start = (index + 1) % self.capacity
+            self.evicted += 1
+
+    def add_listener(self, listener):
+        """
+        Calls `listener` with each new Calculation until it is removed
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Stops calling `listener` with new calculations
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def record_at(self, index):
+        """
+        Gets a calculation by its position in the underlying arrays
+        """
+        return Calculation(self.values[index], self.directions[index],
+                           self.results[index], self.timestamps[index])
+
+    def record(self, position):
+        """
+        Gets a calculation held in memory
+        :param position: 0 is the oldest calculation in memory, -1 the newest
+        :return: Calculation
+        """
+
+        size = len(self.values)
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("history position out of range")
+
+        return self.record_at((self.start + position) % size)
+
+    def __iter__(self):
+        """
+        Calculations held in memory, oldest to newest
+        """
+        # whole columns are sliced (a quick copy) rather than fetching each record
+        for part in (slice(self.start, None), slice(0, self.start)):
+            yield from map(Calculation, self.values[part], self.directions[part],
+                           self.results[part], self.timestamps[part])
+
+    def iter_records(self):
+        """
+        Every calculation (spilled ones first, then those in memory), oldest to newest.
+        The history is copied when this is called, so the records can be read from
+        another thread (e.g. an export) while new calculations are being added.
+        :return: Iterator of Calculation
+        """
+
+        # the journal has every calculation, including earlier sessions
+        if self.journal is not None:
+            return self.journal.read_records()
+
+        spilled = 0
+        if self.spill_file is not None and self.evicted > 0:
+            spilled = self.evicted
+            if self.spill_out is not None:
+                self.spill_out.flush()
+
+        columns = [(self.values[part], self.directions[part],
+                    self.results[part], self.timestamps[part])
+                   for part in (slice(self.start, None), slice(0, self.start))]
+
+        return self.read_records(spilled, columns)
+
+    def read_records(self, spilled, columns):
+        """
+        Reads `spilled` calculations from the spill file, then the copied columns
+        """
+
+        if spilled:
+            with open(self.spill_file) as spill_in:
+                for line in itertools.islice(spill_in, spilled):
+                    value, direction, result, timestamp = line.split(",")
+                    yield Calculation(float(value), int(direction),
+                                      float(result), float(timestamp))
+
+        for values, directions, results, timestamps in columns:
+            yield from map(Calculation, values, directions, results, timestamps)
+
+    def spill(self, item):
+        """
+        Appends an overwritten calculation to the spill file
+        """
+
+        # start a fresh file for the first spill, append if it was closed since
+        if self.spill_out is None:
+            self.spill_out = open(self.spill_file, "w" if self.evicted == 0 else "a")
+
+        self.spill_out.write(f"{item.value!r},{item.direction},{item.result!r},"
+                             f"{item.timestamp!r}\n")
+
+    def sync(self):
+        """
+        Saves any calculations waiting to be written to the journal (if there is one)
+        """
+        if self.journal is not None:
+            self.journal.sync()
+
+    def close(self):
+        """
+        Closes the spill file and journal (if there are any)
+        """
+
+        if self.journal is not None:
+            self.journal.close()
+
+        if self.spill_out is not None:
+            self.spill_out.close()
+            self.spill_out = None
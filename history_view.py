@@ -0,0 +1,141 @@
+from tkinter import *
+import history_store as hs
+
+# Scrolling history list that only draws the rows on screen. Each row is a
+# canvas text item that is reused as the list scrolls, and calculations are
+# fetched from the history store only when their row becomes visible, so the
+# list stays quick however long the history is.
+
+ROW_HEIGHT = 24
+VISIBLE_ROWS = 10
+
+# rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+
+
+def window_statements(history, top, rows):
+    """
+    The text for each row of a window onto the history (no widgets needed, so
+    it can be benchmarked on its own)
+    :param history: HistoryStore to show
+    :param top: Position of the top row (0 = newest calculation)
+    :param rows: Number of rows in the window
+    :return: List of answer statements ("" for rows past the oldest calculation)
+    """
+
+    count = len(history)
+    texts = []
+    for position in range(top, top + rows):
+        if position < count:
+            calc = history.record(-1 - position)
+            texts.append(hs.make_statement(calc.value, calc.direction, calc.result))
+        else:
+            texts.append("")
+
+    return texts
+
+
+class HistoryView:
+    """
+    Virtual list of the calculations held in a HistoryStore (newest first)
+    """
+
+    def __init__(self, parent, history, rows=VISIBLE_ROWS, width=300, bg=None,
+                 font=("Arial", "14")):
+        """
+        :param parent: Widget to put the list in
+        :param history: HistoryStore to show
+        :param rows: Number of rows on screen
+        :param width: Width of the list in pixels
+        :param bg: Background colour
+        :param font: Font for the calculations
+        """
+
+        self.history = history
+        self.rows = rows
+
+        # position of the top row on screen (0 = newest calculation)
+        self.top = 0
+
+        self.frame = Frame(parent)
+
+        self.canvas = Canvas(self.frame, width=width, height=rows * ROW_HEIGHT,
+                             bg=bg, highlightthickness=0)
+        self.canvas.grid(row=0, column=0)
+
+        self.scrollbar = Scrollbar(self.frame, orient=VERTICAL, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # one text item per row on screen - reused as the list scrolls
+        self.row_items = [self.canvas.create_text(10, row * ROW_HEIGHT + ROW_HEIGHT // 2,
+                                                  anchor="w", font=font)
+                          for row in range(rows)]
+
+        # mouse wheel (Windows / macOS, then Linux)
+        self.canvas.bind("<MouseWheel>", self.wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_to(self.top - WHEEL_ROWS))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_to(self.top + WHEEL_ROWS))
+
+        self.refresh()
+
+    def grid(self, **options):
+        self.frame.grid(**options)
+
+    def config(self, bg=None):
+        """
+        Changes the background colour of the list
+        """
+        self.canvas.config(bg=bg)
+
+    def yview(self, *args):
+        """
+        Scrollbar command - ("moveto", fraction) or ("scroll", amount, "units" / "pages")
+        """
+
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.history)))
+
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.rows
+            self.scroll_to(self.top + amount)
+
+    def wheel(self, event):
+        """
+        Scrolls for a mouse wheel event (delta is 120 per notch)
+        """
+        self.scroll_to(self.top - event.delta // 120 * WHEEL_ROWS)
+
+    def scroll_to(self, top):
+        """
+        Shows the list from position `top` (0 = newest calculation)
+        """
+
+        self.top = max(0, min(top, len(self.history) - self.rows))
+        self.refresh()
+
+    def calculation_added(self):
+        """
+        Keeps the same calculations on screen when a new one arrives, unless
+        the newest ones are being shown (then the new one appears at the top)
+        """
+
+        if self.top > 0:
+            self.top += 1
+        self.scroll_to(self.top)
+
+    def refresh(self):
+        """
+        Redraws the rows on screen and the scrollbar
+        """
+
+        texts = window_statements(self.history, self.top, self.rows)
+        for item, text in zip(self.row_items, texts):
+            self.canvas.itemconfig(item, text=text)
+
+        count = len(self.history)
+        if count > self.rows:
+            self.scrollbar.set(self.top / count, (self.top + self.rows) / count)
+        else:
+            self.scrollbar.set(0, 1)
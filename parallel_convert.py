@@ -0,0 +1,142 @@
+import csv
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import bulk_convert as bc
+
+# Parallel bulk conversion - splits a file into byte ranges that start and end on
+# line boundaries and converts the ranges in separate processes. The answers are
+# written in the same order as the input. Assumes one reading per line (quoted
+# values with line breaks in them are not supported in this mode).
+
+# size of each byte range handed to a worker
+CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def find_chunks(file_name, chunk_bytes=CHUNK_BYTES, start=0):
+    """
+    Splits a file into byte ranges that end on line boundaries
+    :param file_name: File to split
+    :param chunk_bytes: Rough size of each range (ranges are extended to the end of a line)
+    :param start: Byte offset to start from (e.g. just after a header line)
+    :return: List of (start, end) byte offsets
+    """
+
+    file_size = os.path.getsize(file_name)
+    chunks = []
+
+    with open(file_name, "rb") as in_file:
+        while start < file_size:
+            end = start + chunk_bytes
+            if end >= file_size:
+                end = file_size
+            else:
+                # move the end forward to just after the next line break
+                in_file.seek(end)
+                in_file.readline()
+                end = min(in_file.tell(), file_size)
+
+            chunks.append((start, end))
+            start = end
+
+    return chunks
+
+
+def convert_range(file_name, start, end, direction, delimiter=",", column=0):
+    """
+    Converts one byte range of a file (runs in a worker process)
+    :return: (converted text, rows converted, errors) - errors are (row number in
+             the range, raw value, error kind)
+    """
+
+    with open(file_name, "rb") as in_file:
+        in_file.seek(start)
+        text = in_file.read(end - start).decode("utf-8")
+
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+    out_text = io.StringIO()
+    writer = csv.writer(out_text, delimiter=delimiter, lineterminator="\n")
+
+    converted = 0
+    all_errors = []
+    for out_rows, errors in bc.convert_rows(reader, direction, column):
+        writer.writerows(out_rows)
+        converted += len(out_rows)
+        all_errors.extend(errors)
+
+    return out_text.getvalue(), converted, all_errors
+
+
+def convert_file_parallel(file_name, out_file, direction, workers=None, delimiter=",",
+                          column=0, header=False, chunk_bytes=CHUNK_BYTES, report=None):
+    """
+    Converts a CSV / TSV file using several processes, keeping the input order
+    :param file_name: File to read (must be a real file, not stdin)
+    :param out_file: Text file to write
+    :param direction: "celsius" or "fahrenheit" (the scale to convert to)
+    :param workers: Number of worker processes (default: number of CPUs)
+    :param delimiter: Column separator
+    :param column: Index of the column holding the temperature
+    :param header: True if the first line is a header (copied, not converted)
+    :param chunk_bytes: Rough size of each byte range handed to a worker
+    :param report: Optional bulk_errors.ErrorReport to send each range's errors to
+                   (raises bulk_errors.ErrorBudgetExceeded if its budget runs out)
+    :return: (rows converted, rows with errors)
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    start = 0
+    if header:
+        with open(file_name, "rb") as in_file:
+            header_line = in_file.readline()
+            start = in_file.tell()
+
+        header_row = next(csv.reader([header_line.decode("utf-8")], delimiter=delimiter), [])
+        csv.writer(out_file, delimiter=delimiter,
+                   lineterminator="\n").writerow(header_row + [direction])
+
+    converted = 0
+    invalid = 0
+
+    # only a few ranges are in flight at once so memory use stays bounded
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for chunk_start, chunk_end in find_chunks(file_name, chunk_bytes, start):
+                pending.append(executor.submit(convert_range, file_name, chunk_start,
+                                               chunk_end, direction, delimiter, column))
+
+                if len(pending) >= workers * 2:
+                    converted, invalid = _write_result(pending.popleft(), out_file,
+                                                       converted, invalid, report)
+
+            while pending:
+                converted, invalid = _write_result(pending.popleft(), out_file,
+                                                   converted, invalid, report)
+        except BaseException:
+            # e.g. the error budget ran out - don't wait for ranges that haven't started
+            for future in pending:
+                future.cancel()
+            raise
+
+    return converted, invalid
+
+
+def _write_result(future, out_file, converted, invalid, report=None):
+    """
+    Waits for one range to finish, writes it and updates the totals
+    """
+
+    out_text, range_converted, errors = future.result()
+    out_file.write(out_text)
+
+    if report is not None:
+        # row numbers from the worker count from the start of its range
+        first_row = converted + invalid
+        report.add(range_converted + len(errors),
+                   [(first_row + row_number, raw, kind) for row_number, raw, kind in errors])
+
+    return converted + range_converted, invalid + len(errors)
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import conversion_service as cs
+
+# Load test client for conversion_service - opens several connections, sends
+# pipelined requests on each (up to --depth waiting for answers at once) and
+# reports latency percentiles and requests per second.
+# Run with: python service_load_test.py [--connections 8] [--requests 5000] [--batch 0]
+
+
+def percentile(sorted_values, share):
+    """
+    Value `share` (0 - 1) of the way through a sorted list
+    """
+    return sorted_values[min(len(sorted_values) - 1, int(share * len(sorted_values)))]
+
+
+def make_request(request_id, batch):
+    """
+    A random request - a single value, or a batch of `batch` values
+    """
+
+    direction = random.choice(["celsius", "fahrenheit"])
+    if batch:
+        values = [round(random.uniform(-200, 1000), 1) for count in range(batch)]
+        return {"id": request_id, "to": direction, "values": values}
+
+    return {"id": request_id, "to": direction, "value": round(random.uniform(-200, 1000), 1)}
+
+
+async def run_connection(open_connection, requests, depth, batch, latencies):
+    """
+    Sends `requests` pipelined requests on one connection, recording each latency
+    """
+
+    reader, writer = await open_connection()
+    window = asyncio.Semaphore(depth)
+    send_times = []
+
+    async def send_all():
+        for request_id in range(requests):
+            await window.acquire()
+            send_times.append(time.perf_counter())
+            writer.write(json.dumps(make_request(request_id, batch)).encode() + b"\n")
+            await writer.drain()
+
+    async def read_all():
+        # answers come back in the order the requests were sent
+        for request_id in range(requests):
+            line = await reader.readline()
+            latencies.append(time.perf_counter() - send_times[request_id])
+            response = json.loads(line)
+            if response.get("id") != request_id:
+                raise RuntimeError(f"answer out of order: {response}")
+            window.release()
+
+    await asyncio.gather(send_all(), read_all())
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load_test(args):
+    if args.unix is not None:
+        open_connection = lambda: asyncio.open_unix_connection(args.unix, limit=cs.MAX_LINE)
+    else:
+        open_connection = lambda: asyncio.open_connection(args.host, args.port,
+                                                          limit=cs.MAX_LINE)
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[run_connection(open_connection, args.requests, args.depth,
+                                          args.batch, latencies)
+                           for count in range(args.connections)])
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    values = total * max(args.batch, 1)
+    print(f"{total} requests ({values} values) over {args.connections} connections "
+          f"in {seconds:.2f}s")
+    print(f"requests/s: {total / seconds:,.0f}   values/s: {values / seconds:,.0f}")
+    print(f"latency p50: {percentile(latencies, 0.5) * 1000:.2f} ms   "
+          f"p99: {percentile(latencies, 0.99) * 1000:.2f} ms   "
+          f"mean: {statistics.mean(latencies) * 1000:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversion service load test")
+    parser.add_argument("--host", default=cs.HOST)
+    parser.add_argument("--port", type=int, default=cs.PORT)
+    parser.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--connections", type=int, default=8, help="connections to open")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per connection")
+    parser.add_argument("--depth", type=int, default=32,
+                        help="most requests waiting for an answer on each connection")
+    parser.add_argument("--batch", type=int, default=0,
+                        help="values per request (0 sends single value requests)")
+    args = parser.parse_args(argv)
+
+    asyncio.run(load_test(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())